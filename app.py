@@ -1,15 +1,35 @@
 import os
 import json
 import threading
+try:
+    import fcntl
+except ImportError:  # Windows: a single process, nothing to coordinate
+    fcntl = None
 from flask import Flask, request, jsonify, send_from_directory, make_response, Response, abort, session
+from flask import redirect, stream_with_context
 from flask_cors import CORS
 import yt_dlp
 
 
 from utils.downloader import extract_metadata, get_video_info, start_download, cancel_download
-from utils.status_manager import get_status
+from utils.downloader import start_audio_download
+from utils.downloader import pause_download, resume_download, get_live_file
+from utils.live_stream import follow, WRITING, DONE, FAILED, UNSUPPORTED
+from utils.downloader import get_metadata_cache_stats, iter_batch_metadata
+from utils.downloader import start_progressive_metadata, get_progressive_metadata
+from utils.ydl_pool import ydl_pool
+from utils.redirect_resolver import get_redirect_cache_stats
+from utils.failure_cache import get_failure_cache_stats
+from utils.scheduler import download_scheduler, fragment_budget, QueueFull
+from utils.bandwidth import bandwidth_governor
+from utils.media_store import media_stats
+from utils.status_manager import get_status, has_status, status_store_stats
+from utils.status_events import status_events
 from utils.history_manager import load_history
 from utils.cleanup import cleanup_old_files
+from utils.metadata_store import run_compactor, store_stats
+from utils.job_registry import job_registry, run_reaper
+from config import ENABLE_METADATA_STORE, BATCH_MAX_ITEMS, STREAM_START_TIMEOUT, BACKGROUND_LOCK_PATH
 from utils.downloader import search_youtube
 
 # ✅ Initialize Flask App
@@ -25,8 +45,24 @@ os.makedirs(VIDEO_DIR, exist_ok=True)
 os.makedirs(AUDIO_DIR, exist_ok=True)
 
 # ✅ Background Cleanup Task
-def start_background_tasks():
+def run_shared_tasks():
+    # Every gunicorn worker imports this module; the directories and the
+    # metadata store are shared, so only the worker holding the lock cleans
+    # them. The lock is released when that worker exits.
+    if fcntl:
+        os.makedirs(os.path.dirname(BACKGROUND_LOCK_PATH), exist_ok=True)
+        fd = os.open(BACKGROUND_LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)  # held for the life of this process
+        print(f"[BACKGROUND] 🔒 Worker {os.getpid()} runs cleanup and compaction")
     threading.Thread(target=cleanup_old_files, daemon=True).start()
+    if ENABLE_METADATA_STORE:
+        threading.Thread(target=run_compactor, daemon=True).start()
+
+
+def start_background_tasks():
+    threading.Thread(target=run_shared_tasks, daemon=True).start()
+    # Per process: each worker reaps its own job registry
+    threading.Thread(target=run_reaper, daemon=True).start()
 
 
 start_background_tasks()
@@ -69,6 +105,7 @@ def serve_media_file(directory, filename):
             '.m4a': 'audio/mp4',
             '.aac': 'audio/aac',
             '.ogg': 'audio/ogg',
+            '.opus': 'audio/ogg',
             '.wav': 'audio/wav'
         }.get(ext, 'application/octet-stream')
 
@@ -92,11 +129,54 @@ def fetch_info():
             abort(400, "URL is required.")
         print(f"[INFO] Fetching metadata for: {url}")
 
+        # Progressive: basic card now, poll /fetch_info/<download_id> for formats
+        if data.get('progressive'):
+            return jsonify(start_progressive_metadata(url))
+
         video_info = get_video_info(url)
+        if video_info.get('busy'):
+            response = jsonify(video_info)
+            response.headers['Retry-After'] = '30'
+            return response, 503
         return Response(json.dumps(video_info), content_type='application/json')
     except Exception as e:
         return jsonify({'error': f'Exception during fetch: {str(e)}'}), 500
 
+# ✅ Full Video Info for a progressive fetch (poll until "complete": true)
+@app.route('/fetch_info/<download_id>')
+def fetch_info_result(download_id):
+    try:
+        result = get_progressive_metadata(download_id)
+        if result is None:
+            return jsonify({'error': 'Unknown or expired download ID'}), 404
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': f'Exception during fetch: {str(e)}'}), 500
+
+# ✅ Fetch Video Info for many URLs (NDJSON stream, one line per URL as it finishes)
+@app.route('/fetch_info/batch', methods=['POST'])
+def fetch_info_batch():
+    try:
+        data = request.get_json(force=True)
+        if not isinstance(data, dict) or not isinstance(data.get('urls'), list):
+            return jsonify({'error': 'urls must be a list of URLs'}), 400
+        urls = [u.strip() for u in data['urls'] if isinstance(u, str) and u.strip()]
+        if not urls:
+            return jsonify({'error': 'urls is required'}), 400
+        if len(urls) > BATCH_MAX_ITEMS:
+            return jsonify({'error': f'At most {BATCH_MAX_ITEMS} URLs per batch'}), 400
+        print(f"[INFO] Batch fetching metadata for {len(urls)} URLs")
+
+        def generate():
+            for index, url, result in iter_batch_metadata(urls):
+                yield json.dumps({'index': index, 'url': url, **result}) + "\n"
+
+        response = Response(generate(), content_type='application/x-ndjson')
+        response.headers['X-Accel-Buffering'] = 'no'  # let NGINX flush each line
+        return response
+    except Exception as e:
+        return jsonify({'error': f'Exception during batch fetch: {str(e)}'}), 500
+
 # ✅ In-App Browser Extraction (WebView)
 @app.route('/extract', methods=['POST'])
 def extract_from_webview():
@@ -120,13 +200,27 @@ def download():
         quality = data.get('quality', '').strip()
         type_ = data.get('type', 'video').strip().lower()  # 'audio' or 'video'
 
+        if type_ == 'audio':
+            # Native stream by default; MP3 only when the client asks for it
+            audio_format = data.get('audio_format', 'native').strip().lower()
+            if not url or audio_format not in ('native', 'mp3'):
+                return jsonify({'error': 'Missing URL or unsupported audio_format'}), 400
+            audio_quality = ''.join(c for c in quality if c.isdigit()) or '192'
+            print(f"[DOWNLOAD] Starting for: {url} [audio/{audio_format}]")
+            download_id = start_audio_download(url, audio_quality=audio_quality, audio_format=audio_format)
+            return jsonify({'download_id': download_id, 'status': 'started'})
+
         if not url or not quality:
             return jsonify({'error': 'Missing URL or quality'}), 400
 
         print(f"[DOWNLOAD] Starting for: {url} [{type_}]")
 
-        download_id = start_download(url, quality, type_)
+        download_id = start_download(url, quality, data.get('bandwidth_limit'))
         return jsonify({'download_id': download_id, 'status': 'started'})
+    except QueueFull as e:
+        response = jsonify({'error': f'Server busy: {str(e)}'})
+        response.headers['Retry-After'] = '30'
+        return response, 429
     except Exception as e:
         return jsonify({'error': f'Failed to start download: {str(e)}'}), 500
 
@@ -141,6 +235,57 @@ def cancel(download_id):
     except Exception as e:
         return jsonify({'error': f'Failed to cancel: {str(e)}'}), 500
 
+# ✅ Pause Download (partial files are kept)
+@app.route('/pause/<download_id>', methods=['POST'])
+def pause(download_id):
+    try:
+        if pause_download(download_id):
+            return jsonify({'status': 'paused'})
+        return jsonify({'error': 'Invalid download ID or already finished'}), 400
+    except Exception as e:
+        return jsonify({'error': f'Failed to pause: {str(e)}'}), 500
+
+# ✅ Resume Download
+@app.route('/resume/<download_id>', methods=['POST'])
+def resume(download_id):
+    try:
+        if resume_download(download_id):
+            return jsonify({'status': 'resumed'})
+        return jsonify({'error': 'Invalid download ID or already finished'}), 400
+    except QueueFull as e:
+        response = jsonify({'error': f'Server busy: {str(e)}'})
+        response.headers['Retry-After'] = '30'
+        return response, 429
+    except Exception as e:
+        return jsonify({'error': f'Failed to resume: {str(e)}'}), 500
+
+# ✅ Stream a Download While It Is Still Running (single-file formats)
+@app.route('/stream/<download_id>')
+def stream(download_id):
+    try:
+        live = get_live_file(download_id)
+        if live is None:
+            data = get_status(download_id)
+            if data and data.get('status') == 'completed' and data.get('video_url'):
+                return redirect(data['video_url'])
+            return jsonify({'error': 'Invalid download ID or nothing to stream'}), 404
+
+        state = live.wait_started(STREAM_START_TIMEOUT)
+        if state == UNSUPPORTED:
+            return jsonify({'error': 'This format cannot be followed while downloading; fetch it from video_url when completed'}), 409
+        if state == FAILED:
+            return jsonify({'error': 'Download failed', 'status': get_status(download_id)}), 410
+        if state not in (WRITING, DONE):
+            return jsonify({'error': 'Download has not started writing yet, retry shortly'}), 503
+
+        headers = {'X-Accel-Buffering': 'no', 'Cache-Control': 'no-store'}
+        if live.size:
+            headers['Content-Length'] = str(live.size)
+        print(f"[STREAM] ▶️ Following {download_id} ({state})")
+        return Response(stream_with_context(follow(live)), mimetype='video/mp4', headers=headers)
+    except Exception as e:
+        return jsonify({'error': f'Stream failed: {str(e)}'}), 500
+
 # ✅ Check Download Status
 @app.route('/status/<download_id>')
 def status(download_id):
@@ -148,10 +293,56 @@ def status(download_id):
         data = get_status(download_id)
         if not data:
             return jsonify({'error': 'Invalid download ID'}), 404
+        position = download_scheduler.position(download_id)
+        if position is not None:
+            data = {**data, 'queue_position': position}
         return jsonify(data)
     except Exception as e:
         return jsonify({'error': f'Status check failed: {str(e)}'}), 500
 
+# ✅ Push Download Status (Server-Sent Events instead of polling /status)
+@app.route('/status/<download_id>/events')
+def status_stream(download_id):
+    if not has_status(download_id):
+        return jsonify({'error': 'Invalid download ID'}), 404
+
+    def with_queue_position(data):
+        position = download_scheduler.position(download_id)
+        return {**data, 'queue_position': position} if position is not None else data
+
+    headers = {'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'}
+    return Response(stream_with_context(status_events(download_id, with_queue_position)),
+                    mimetype='text/event-stream', headers=headers)
+
+# ✅ Metadata Cache Stats (hit/miss counters for sizing)
+@app.route('/stats/cache')
+def cache_stats():
+    try:
+        return jsonify({
+            'metadata': get_metadata_cache_stats(),
+            'metadata_store': store_stats(),
+            'ydl_pool': ydl_pool.stats(),
+            'redirects': get_redirect_cache_stats(),
+            'failures': get_failure_cache_stats(),
+            'media': media_stats()
+        })
+    except Exception as e:
+        return jsonify({'error': f'Failed to load cache stats: {str(e)}'}), 500
+
+# ✅ Download Scheduler Stats
+@app.route('/stats/scheduler')
+def scheduler_stats():
+    try:
+        return jsonify({
+            **download_scheduler.stats(),
+            'fragments': fragment_budget.stats(),
+            'bandwidth': bandwidth_governor.stats(),
+            'statuses': status_store_stats(),
+            'jobs': job_registry.stats()
+        })
+    except Exception as e:
+        return jsonify({'error': f'Failed to load scheduler stats: {str(e)}'}), 500
+
 # ✅ Download History
 @app.route('/history')
 def history():
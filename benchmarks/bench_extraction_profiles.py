@@ -0,0 +1,170 @@
+"""
+HTTP requests and wall time per extraction profile (card / formats / download).
+
+Record fixtures once against the live site, then replay them offline so runs
+are comparable and don't touch the platforms:
+
+    python -m benchmarks.bench_extraction_profiles record https://youtu.be/dQw4w9WgXcQ
+    python -m benchmarks.bench_extraction_profiles replay [platform]
+
+Fixtures land in benchmarks/fixtures/<platform>/<profile>.json (not committed).
+Replay serves recorded responses by method and URL, ignoring query parameters
+that change on every request (VOLATILE_PARAMS). A request with no recorded
+match is a miss: it fails with a DownloadError and marks the profile's run
+as invalid, since its request count and time no longer describe the profile.
+
+No fixtures have been recorded yet (the development sandbox has no access to
+the platforms), so the per-profile savings are still unmeasured. Record once
+on a machine with network access before quoting numbers.
+"""
+import os
+import io
+import sys
+import json
+import time
+import base64
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import yt_dlp
+from yt_dlp.networking import Request
+from yt_dlp.networking.common import Response
+
+from utils.platform_helper import detect_platform
+from utils.extraction_profiles import extraction_opts, PROFILE_NAMES
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+# Per-request tokens, nonces and timestamps (YouTube, TikTok, generic cache busters)
+VOLATILE_PARAMS = {
+    "_", "cpn", "rn", "rbuf", "t", "ei", "expire", "sig", "signature", "lsig", "n", "pot",
+    "sparams", "ip", "X-Bogus", "_signature", "msToken", "verifyFp", "device_id",
+}
+
+BASE_OPTS = {
+    'quiet': True,
+    'skip_download': True,
+    'noplaylist': True,
+    'cachedir': False,  # a warm player cache would hide requests
+}
+
+
+def _fixture_path(platform, profile):
+    return os.path.join(FIXTURE_DIR, platform, f"{profile}.json")
+
+
+def _match_key(method, url):
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in VOLATILE_PARAMS)
+    return method, parts.scheme, parts.netloc, parts.path, urlencode(query)
+
+
+def _as_request(req):
+    return Request(req) if isinstance(req, str) else req
+
+
+class _Recorder:
+    def __init__(self, ydl):
+        self.entries = []
+        self._orig = ydl.urlopen
+        ydl.urlopen = self
+
+    def __call__(self, req):
+        req = _as_request(req)
+        res = self._orig(req)
+        body = res.read()
+        self.entries.append({
+            "method": req.method,
+            "url": req.url,
+            "status": res.status,
+            "response_url": res.url,
+            "headers": dict(res.headers),
+            "body": base64.b64encode(body).decode("ascii"),
+        })
+        return Response(io.BytesIO(body), res.url, res.headers, status=res.status, reason=res.reason)
+
+
+class _Replayer:
+    def __init__(self, ydl, entries):
+        self.remaining = list(entries)
+        self.count = 0
+        self.misses = []
+        ydl.urlopen = self
+
+    def __call__(self, req):
+        req = _as_request(req)
+        self.count += 1
+        key = _match_key(req.method, req.url)
+        match = next((e for e in self.remaining if _match_key(e["method"], e["url"]) == key), None)
+        if match is None:
+            self.misses.append(f"{req.method} {req.url}")
+            raise yt_dlp.utils.DownloadError(f"No recorded response for {req.method} {req.url}")
+        self.remaining.remove(match)
+        return Response(
+            io.BytesIO(base64.b64decode(match["body"])),
+            match["response_url"], match["headers"], status=match["status"]
+        )
+
+
+def record(url):
+    platform = detect_platform(url)
+    os.makedirs(os.path.join(FIXTURE_DIR, platform), exist_ok=True)
+    for profile in PROFILE_NAMES:
+        with yt_dlp.YoutubeDL({**BASE_OPTS, **extraction_opts(platform, profile)}) as ydl:
+            recorder = _Recorder(ydl)
+            start = time.perf_counter()
+            ydl.extract_info(url, download=False)
+            elapsed = time.perf_counter() - start
+        with open(_fixture_path(platform, profile), "w") as f:
+            json.dump({"url": url, "entries": recorder.entries}, f)
+        print(f"[RECORD] {platform}/{profile:<9} requests={len(recorder.entries):3d}  live={elapsed:6.2f}s")
+
+
+def replay(platforms):
+    """Returns False if any profile made a request that was not recorded."""
+    valid = True
+    for platform in platforms:
+        for profile in PROFILE_NAMES:
+            path = _fixture_path(platform, profile)
+            if not os.path.exists(path):
+                print(f"[REPLAY] {platform}/{profile:<9} no fixture — run 'record' first")
+                continue
+            with open(path) as f:
+                fixture = json.load(f)
+
+            with yt_dlp.YoutubeDL({**BASE_OPTS, **extraction_opts(platform, profile)}) as ydl:
+                replayer = _Replayer(ydl, fixture["entries"])
+                start = time.perf_counter()
+                try:
+                    info = ydl.extract_info(fixture["url"], download=False)
+                    formats = len(info.get("formats") or [])
+                except Exception as e:
+                    formats = f"error: {e}"
+                elapsed = time.perf_counter() - start
+
+            if replayer.misses:
+                valid = False
+                print(f"[REPLAY] {platform}/{profile:<9} INVALID: {len(replayer.misses)} unrecorded request(s), "
+                      f"re-record this fixture")
+                for miss in replayer.misses:
+                    print(f"           {miss}")
+                continue
+            print(
+                f"[REPLAY] {platform}/{profile:<9} requests={replayer.count:3d}  "
+                f"bytes={sum(len(e['body']) * 3 // 4 for e in fixture['entries']):9d}  "
+                f"time={elapsed * 1000:8.1f}ms  formats={formats}"
+            )
+    return valid
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3 and sys.argv[1] == "record":
+        record(sys.argv[2])
+    elif len(sys.argv) >= 2 and sys.argv[1] == "replay":
+        targets = sys.argv[2:]
+        if not targets and os.path.isdir(FIXTURE_DIR):
+            targets = sorted(os.listdir(FIXTURE_DIR))
+        sys.exit(0 if replay(targets) else 1)
+    else:
+        print(__doc__)
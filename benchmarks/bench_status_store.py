@@ -0,0 +1,126 @@
+"""
+Status update throughput with many concurrent jobs: one global lock writing
+every tick (the old status_manager) vs. lock-striped shards with rate-limited
+progress writes.
+
+Each job thread sends progress ticks as fast as it can, with a state change
+every few hundred ticks, while one reader thread polls random jobs the way
+/status does. No network or downloads involved. Also compares the memory
+held per job by a StatusRecord against the old per-job status dict.
+
+The saturated run starves the reader once writes stop contending: with
+hundreds of runnable CPU-bound threads, a writer preempted while holding a
+shard lock only runs again after every other thread has had its GIL slice,
+and a reader waiting on that lock waits with it. With one global lock most
+writers sit blocked on the lock instead, so fewer threads compete. Real
+writers are yt-dlp progress hooks between network reads, mostly idle, so
+the paced run, where each job ticks every PACED_TICK seconds, reports what
+/status sees: read latency under a realistic write load.
+
+    python -m benchmarks.bench_status_store [jobs] [seconds]
+"""
+import os
+import sys
+import random
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.status_manager import StatusStore, StatusRecord
+
+STATE_EVERY = 500  # ticks between state changes
+PACED_TICK = 0.005  # seconds between ticks per job in the paced run (~200 chunks/s)
+VARIANTS = [
+    ("1 lock, every tick", 1, 0),
+    ("32 shards, every tick", 32, 0),
+    ("32 shards, 0.25s ticks", 32, 0.25),
+]
+
+
+def _run(store, jobs, seconds, tick=0.0):
+    # Threads stop on their own deadline; with hundreds of busy threads the
+    # main thread may not get the GIL back in time to signal them.
+    start = threading.Barrier(jobs + 2)  # writers, reader, main
+    deadline = [0.0]
+    calls = [0] * jobs
+    reads = [0]
+    latencies = []
+    ids = [f"job-{i}" for i in range(jobs)]
+
+    def writer(i):
+        download_id = ids[i]
+        n = 0
+        store.update(download_id, {"status": "downloading"})
+        start.wait()
+        while time.monotonic() < deadline[0]:
+            n += 1
+            if n % STATE_EVERY == 0:
+                state = "converting" if (n // STATE_EVERY) % 2 else "downloading"
+                store.update(download_id, {"status": state, "phase": state})
+            else:
+                store.update(download_id, {"progress": n % 100, "speed": n * 1024, "downloaded": n})
+            if tick:
+                time.sleep(tick)
+        calls[i] = n
+
+    def reader():
+        start.wait()
+        while time.monotonic() < deadline[0]:
+            began = time.perf_counter()
+            store.get(random.choice(ids))
+            latencies.append(time.perf_counter() - began)
+            reads[0] += 1
+            if tick:
+                time.sleep(0.001)  # a client polling, not a spin loop
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(jobs)]
+    threads.append(threading.Thread(target=reader))
+    for t in threads:
+        t.start()
+    deadline[0] = time.monotonic() + seconds  # read by the threads only after the barrier
+    start.wait()
+    began = time.monotonic()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - began
+
+    writes = sum(record.version for shard in store._shards for record in shard.statuses.values())
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0.0
+    return sum(calls) / elapsed, writes / elapsed, reads[0] / elapsed, p99
+
+
+def _legacy_status(now):
+    # The 18-key dict every job used to get (DEFAULT_STATUS.copy())
+    return {
+        "status": "pending", "progress": 0.0, "speed": "0KB/s", "eta": None, "downloaded": 0,
+        "total": 0, "video_url": None, "platform": None, "phase": None, "message": None,
+        "error": None, "timestamp": now, "created_at": now, "completed_at": None,
+        "file_type": "video", "filename": None, "fragment_concurrency": None, "postprocess": None,
+    }
+
+
+def _bytes_per_job(factory, count=10000):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = [factory(int(time.time())) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del held
+    return (after - before) / count
+
+
+if __name__ == "__main__":
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+    for title, tick in (("saturated", 0.0), (f"paced, one tick per {PACED_TICK}s per job", PACED_TICK)):
+        print(f"[BENCH] Status updates, {jobs} concurrent jobs, {seconds}s per variant ({title})")
+        for label, shards, interval in VARIANTS:
+            store = StatusStore(shards=shards, progress_interval=interval)
+            calls, writes, reads, p99 = _run(store, jobs, seconds, tick)
+            print(f"{label:<24} updates/s={calls:>11,.0f}  writes/s={writes:>11,.0f}  "
+                  f"reads/s={reads:>9,.0f}  read p99={p99 * 1000:8.2f}ms")
+    print(f"[BENCH] Memory per job: dict={_bytes_per_job(_legacy_status):.0f}B  "
+          f"StatusRecord={_bytes_per_job(StatusRecord):.0f}B")
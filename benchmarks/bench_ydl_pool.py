@@ -0,0 +1,65 @@
+"""
+Per-request yt-dlp setup cost: fresh YoutubeDL per call vs. pooled checkout.
+
+No network access is needed — this only measures constructing (or reusing)
+the instance, which is the overhead every extraction paid before pooling.
+
+    python -m benchmarks.bench_ydl_pool [iterations]
+"""
+import os
+import sys
+import statistics
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import yt_dlp
+
+from utils.ydl_pool import YoutubeDLPool
+
+OPTS = {
+    'quiet': True,
+    'skip_download': True,
+    'forcejson': True,
+    'noplaylist': True,
+    'extract_flat': False,
+    'http_headers': {'User-Agent': 'Mozilla/5.0 (bench)'},
+}
+
+
+def _summary(label, samples):
+    samples_ms = sorted(s * 1000 for s in samples)
+    p95 = samples_ms[int(len(samples_ms) * 0.95) - 1]
+    print(
+        f"{label:<10} mean={statistics.mean(samples_ms):8.3f}ms  "
+        f"p50={statistics.median(samples_ms):8.3f}ms  p95={p95:8.3f}ms"
+    )
+
+
+def bench_fresh(iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        with yt_dlp.YoutubeDL(OPTS) as ydl:
+            ydl.params.get('quiet')
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_pooled(iterations):
+    pool = YoutubeDLPool(max_in_use=4, max_idle_per_profile=2)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        with pool.checkout(OPTS, "youtube") as ydl:
+            ydl.params.get('quiet')
+        samples.append(time.perf_counter() - start)
+    print(f"pool stats: {pool.stats()}")
+    return samples
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"[BENCH] YoutubeDL setup, {n} iterations")
+    _summary("fresh", bench_fresh(n))
+    _summary("pooled", bench_pooled(n))
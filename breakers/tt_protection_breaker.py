@@ -15,6 +15,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from undetected_chromedriver import Chrome, ChromeOptions
 
+from utils.ydl_pool import pooled_ydl
+from utils.failure_cache import PermanentFailure, classify_failure
+
 GLOBAL_PROXY = os.getenv("YTS_PROXY")
 
 DEFAULT_HEADERS = {
@@ -32,8 +35,13 @@ def breaker(func):
             return func(url, headers or DEFAULT_HEADERS)
         except Exception as e:
             print(f"[BREAKER ❌] Failed: {func.__name__} - {e}")
+            permanent, reason = classify_failure(e)
+            if permanent:
+                # No point launching browsers for a private or deleted video
+                raise PermanentFailure(reason)
             traceback.print_exc()
             return None
+    wrapper.__name__ = func.__name__
     return wrapper
 
 
@@ -52,7 +60,7 @@ def method_yt_dlp(url, headers):
     if GLOBAL_PROXY:
         ydl_opts['proxy'] = GLOBAL_PROXY
 
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+    with pooled_ydl(ydl_opts, "tiktok") as ydl:
         return ydl.extract_info(url, download=False)
 
 
@@ -40,6 +40,17 @@ SUPPORTED_PLATFORMS = {
     "instagram": ["instagram.com"]
 }
 
+# ✅ Short-link Redirect Cache (vt.tiktok.com, fb.watch, ...)
+REDIRECT_CACHE_TTL = int(os.getenv("REDIRECT_CACHE_TTL", "3600"))  # seconds
+REDIRECT_CACHE_MAX_ENTRIES = int(os.getenv("REDIRECT_CACHE_MAX_ENTRIES", "10000"))
+
+# ✅ Negative Cache (private / deleted / geo-blocked / unsupported links)
+NEGATIVE_CACHE_TTL = {
+    platform: int(os.getenv(f"NEGATIVE_CACHE_TTL_{platform.upper()}", os.getenv("NEGATIVE_CACHE_TTL", "300")))
+    for platform in ("youtube", "tiktok", "facebook", "instagram", "twitter", "threads", "unknown")
+}
+NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("NEGATIVE_CACHE_MAX_ENTRIES", "10000"))
+
 # ✅ TikTok Cookie Support
 TIKTOK_COOKIES_FILE = os.path.join(BASE_DIR, "tt_cookies.txt")
 ENABLE_TIKTOK_COOKIES = os.getenv("ENABLE_TIKTOK_COOKIES", "true").lower() == "true"
@@ -50,3 +61,97 @@ DEBUG_MODE = os.getenv("DEBUG_MODE", "false").lower() == "true"
 
 # ✅ History File Path
 HISTORY_FILE = os.path.join(BASE_DIR, "utils", "history.json")
+
+# ✅ Metadata Cache (in-process, per worker)
+ENABLE_METADATA_CACHE = os.getenv("ENABLE_METADATA_CACHE", "true").lower() == "true"
+METADATA_CACHE_TTL = int(os.getenv("METADATA_CACHE_TTL", "600"))  # seconds
+METADATA_CACHE_MAX_ENTRIES = int(os.getenv("METADATA_CACHE_MAX_ENTRIES", "2048"))
+METADATA_CACHE_MAX_BYTES = int(os.getenv("METADATA_CACHE_MAX_MB", "64")) * 1024 * 1024
+
+# ✅ Full info_dict Cache (lets /download skip re-extraction)
+INFO_CACHE_MAX_ENTRIES = int(os.getenv("INFO_CACHE_MAX_ENTRIES", "256"))
+INFO_CACHE_MAX_BYTES = int(os.getenv("INFO_CACHE_MAX_MB", "128")) * 1024 * 1024
+
+# ✅ Batch Metadata (/fetch_info/batch)
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "8"))  # shared by all batch requests
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "30"))
+BATCH_TIMEOUT = int(os.getenv("BATCH_TIMEOUT", "60"))  # seconds for a whole batch
+
+# ✅ Warm yt-dlp Instance Pool (extraction only)
+ENABLE_YDL_POOL = os.getenv("ENABLE_YDL_POOL", "true").lower() == "true"
+YDL_POOL_MAX_IN_USE = int(os.getenv("YDL_POOL_MAX_IN_USE", "16"))
+YDL_POOL_MAX_IDLE_PER_PROFILE = int(os.getenv("YDL_POOL_MAX_IDLE_PER_PROFILE", "4"))
+YDL_POOL_MAX_PROFILES = int(os.getenv("YDL_POOL_MAX_PROFILES", "32"))
+YDL_POOL_MAX_AGE = int(os.getenv("YDL_POOL_MAX_AGE", "900"))  # seconds, picks up refreshed cookie files
+
+# ✅ Persistent Metadata Store (SQLite, shared by all gunicorn workers)
+ENABLE_METADATA_STORE = os.getenv("ENABLE_METADATA_STORE", "false").lower() == "true"
+METADATA_STORE_PATH = os.getenv("METADATA_STORE_PATH", os.path.join(BASE_DIR, "data", "metadata.sqlite3"))
+METADATA_STORE_TTL = int(os.getenv("METADATA_STORE_TTL", "3600"))  # seconds
+METADATA_STORE_COMPACT_INTERVAL = int(os.getenv("METADATA_STORE_COMPACT_INTERVAL", "600"))  # seconds
+
+# ✅ Download Scheduler (fixed worker pool + per-platform caps)
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "8"))
+SCHEDULER_MAX_QUEUE = int(os.getenv("SCHEDULER_MAX_QUEUE", "200"))  # beyond this /download returns 429
+DEFAULT_PLATFORM_CONCURRENCY = int(os.getenv("DEFAULT_PLATFORM_CONCURRENCY", "2"))
+PLATFORM_CONCURRENCY = {
+    platform: int(os.getenv(f"CONCURRENCY_{platform.upper()}", default))
+    for platform, default in {"youtube": "4", "tiktok": "4", "facebook": "2", "instagram": "2"}.items()
+}
+
+# ✅ Completed-media Store (dedup + disk budget instead of fixed age)
+ENABLE_MEDIA_DEDUP = os.getenv("ENABLE_MEDIA_DEDUP", "true").lower() == "true"
+MEDIA_INDEX_PATH = os.getenv("MEDIA_INDEX_PATH", os.path.join(BASE_DIR, "data", "media_index.sqlite3"))
+MEDIA_DISK_BUDGET = int(float(os.getenv("MEDIA_DISK_BUDGET_GB", "20")) * 1024 * 1024 * 1024)
+
+# ✅ Segmented Direct-link Downloads (parallel byte ranges for plain CDN files)
+SEGMENTED_PLATFORMS = set(os.getenv("SEGMENTED_PLATFORMS", "tiktok,facebook").split(","))
+SEGMENTED_CONNECTIONS = int(os.getenv("SEGMENTED_CONNECTIONS", "8"))  # per file
+SEGMENTED_MIN_SIZE = int(float(os.getenv("SEGMENTED_MIN_SIZE_MB", "4")) * 1024 * 1024)  # smaller files use one stream
+SEGMENT_RETRIES = int(os.getenv("SEGMENT_RETRIES", "3"))
+
+# ✅ Concurrent Fragment Downloads (DASH / HLS)
+FRAGMENT_CONCURRENCY = {
+    platform: int(os.getenv(f"FRAGMENTS_{platform.upper()}", default))
+    for platform, default in {"youtube": "4", "tiktok": "1", "facebook": "4", "instagram": "2"}.items()
+}
+DEFAULT_FRAGMENT_CONCURRENCY = int(os.getenv("DEFAULT_FRAGMENT_CONCURRENCY", "1"))
+FRAGMENT_BUDGET = int(os.getenv("FRAGMENT_BUDGET", "32"))  # in-flight fragments across all jobs
+
+# ✅ Stream-through Delivery (/stream/<download_id> while downloading)
+STREAM_START_TIMEOUT = int(os.getenv("STREAM_START_TIMEOUT", "30"))  # seconds to wait for the format choice
+STREAM_IDLE_TIMEOUT = int(os.getenv("STREAM_IDLE_TIMEOUT", "60"))  # close if the writer stalls this long
+
+# ✅ Global Bandwidth Governor (one budget shared by all active downloads)
+BANDWIDTH_TOTAL = int(float(os.getenv("BANDWIDTH_TOTAL_MBPS", "0")) * 1_000_000 / 8)  # bytes/s, 0 = unlimited
+BANDWIDTH_PLATFORM_WEIGHTS = {
+    platform: float(os.getenv(f"BANDWIDTH_WEIGHT_{platform.upper()}", "1"))
+    for platform in ("youtube", "tiktok", "facebook", "instagram")
+}
+BANDWIDTH_PRIORITY_WEIGHTS = {0: 2.0, 10: 1.0, 20: 0.5}  # scheduler PRIORITY_HIGH / NORMAL / LOW
+
+# ✅ Status Events (/status/<download_id>/events, Server-Sent Events)
+SSE_MIN_INTERVAL = float(os.getenv("SSE_MIN_INTERVAL", "1.0"))  # seconds between progress-only events
+SSE_KEEPALIVE = int(os.getenv("SSE_KEEPALIVE", "15"))  # comment line sent when nothing changed
+
+# ✅ Status Store (lock-striped, progress writes rate-limited per job)
+STATUS_SHARDS = int(os.getenv("STATUS_SHARDS", "32"))
+STATUS_PROGRESS_INTERVAL = float(os.getenv("STATUS_PROGRESS_INTERVAL", "0.25"))  # seconds, 0 = write every tick
+
+# ✅ Status Backend (memory = this process only; sqlite = shared by all gunicorn workers)
+# Only statuses are shared: scheduler queues, cancel/pause and shared jobs stay
+# per-process, so /cancel, /pause and /resume must reach the worker that owns
+# the job. Each worker's reaper sweeps only its own rows plus rows left by
+# workers that have exited.
+STATUS_BACKEND = os.getenv("STATUS_BACKEND", "memory").lower()
+STATUS_DB_PATH = os.getenv("STATUS_DB_PATH", os.path.join(BASE_DIR, "data", "status.sqlite3"))
+STATUS_POLL_INTERVAL = float(os.getenv("STATUS_POLL_INTERVAL", "0.2"))  # seconds between SSE checks on sqlite
+
+# ✅ Job Registry (finished jobs are evicted after the retention window)
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", "3600"))  # seconds a finished job's status stays readable
+JOB_REGISTRY_MAX = int(os.getenv("JOB_REGISTRY_MAX", "10000"))  # finished jobs are evicted early beyond this
+JOB_REAP_INTERVAL = int(os.getenv("JOB_REAP_INTERVAL", "60"))  # seconds
+STATUS_STALE_TIMEOUT = int(os.getenv("STATUS_STALE_TIMEOUT", "21600"))  # statuses with no registry entry
+# File cleanup and metadata compaction run in one worker at a time; the others
+# wait on this lock and take over if that worker exits
+BACKGROUND_LOCK_PATH = os.getenv("BACKGROUND_LOCK_PATH", os.path.join(BASE_DIR, "data", "background.lock"))
@@ -8,6 +8,9 @@ from config import VIDEO_DIR
 from utils.status_manager import update_status
 from utils.history_manager import save_to_history
 from utils.platform_helper import load_cookies_from_file, merge_headers_with_cookie
+from utils.ydl_pool import pooled_ydl
+from utils.redirect_resolver import resolve_redirect_url
+from utils.segmented_downloader import download_ranged, direct_download_target
 
 # ✅ Default User-Agent
 HEADERS = {
@@ -19,12 +22,7 @@ HEADERS = {
 
 # ✅ Resolve redirect URLs (like fb.watch)
 def resolve_facebook_redirect(url: str) -> str:
-    try:
-        res = requests.get(url, allow_redirects=True, timeout=10, headers=HEADERS)
-        return res.url
-    except Exception as e:
-        print(f"[FB REDIRECT ERROR] {e}")
-        return url
+    return resolve_redirect_url(url, HEADERS)
 
 # ✅ Fetch Facebook metadata using yt-dlp
 def fetch_facebook_info(url: str, request_headers: dict = None) -> dict:
@@ -46,7 +44,7 @@ def fetch_facebook_info(url: str, request_headers: dict = None) -> dict:
             'http_headers': final_headers,
         }
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with pooled_ydl(ydl_opts, "facebook") as ydl:
             info = ydl.extract_info(real_url, download=False)
 
         formats = info.get("formats", [])
@@ -118,19 +116,35 @@ def download_facebook(url: str, resolution: str, download_id: str, server_url: s
             }],
         }
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(real_url, download=True)
-
         final_file = f"{download_id}.mp4"
         final_path = os.path.join(VIDEO_DIR, final_file)
 
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(real_url, download=False)
+
+            # ✅ Progressive mp4 (sd/hd links): parallel ranges instead of one stream
+            target = direct_download_target(ydl, info)
+            if target and info.get("ext") == "mp4":
+                download_ranged(
+                    output_path=final_path,
+                    progress=lambda done, total, speed: _progress_hook({
+                        "status": "downloading",
+                        "downloaded_bytes": done,
+                        "total_bytes": total,
+                        "speed": speed,
+                    }, download_id),
+                    **target
+                )
+            else:
+                ydl.process_ie_result(info, download=True)
+
         if not os.path.exists(final_path):
             raise Exception("File not found after Facebook download.")
 
         update_status(download_id, {
             "status": "completed",
             "progress": 100,
-            "speed": "0KB/s",
+            "speed": 0,
             "video_url": f"{server_url}/videos/{final_file}"
         })
 
@@ -149,7 +163,7 @@ def download_facebook(url: str, resolution: str, download_id: str, server_url: s
         update_status(download_id, {
             "status": "error",
             "progress": 0,
-            "speed": "0KB/s",
+            "speed": 0,
             "error": str(e)
         })
 
@@ -159,11 +173,10 @@ def _progress_hook(d, download_id):
         total = d.get('total_bytes') or d.get('total_bytes_estimate') or 1
         downloaded = d.get('downloaded_bytes', 0)
         percent = int((downloaded / total) * 100)
-        speed = d.get('speed', 0)
-        speed_str = f"{round(speed / 1024, 1)}KB/s" if speed else "0KB/s"
-
         update_status(download_id, {
             "status": "downloading",
             "progress": percent,
-            "speed": speed_str
+            "speed": d.get('speed') or 0,
+            "downloaded": downloaded,
+            "total": total
         })
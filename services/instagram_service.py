@@ -5,6 +5,7 @@ import os
 from config import VIDEO_DIR
 from utils.status_manager import update_status
 from utils.history_manager import save_to_history
+from utils.ydl_pool import pooled_ydl
 
 # ✅ Default headers
 HEADERS = {
@@ -32,7 +33,7 @@ def fetch_instagram_info(url: str) -> dict:
         if USE_COOKIES:
             ydl_opts['cookiefile'] = COOKIE_FILE
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with pooled_ydl(ydl_opts, "instagram") as ydl:
             info = ydl.extract_info(url, download=False)
 
         if "entries" in info:
@@ -129,7 +130,7 @@ def download_instagram(url: str, resolution: str, download_id: str, server_url:
         update_status(download_id, {
             "status": "completed",
             "progress": 100,
-            "speed": "0KB/s",
+            "speed": 0,
             "video_url": f"{server_url}/videos/{final_file}"
         })
 
@@ -148,7 +149,7 @@ def download_instagram(url: str, resolution: str, download_id: str, server_url:
         update_status(download_id, {
             "status": "error",
             "progress": 0,
-            "speed": "0KB/s",
+            "speed": 0,
             "error": str(e)
         })
 
@@ -158,11 +159,10 @@ def _progress_hook(d, download_id):
         total = d.get('total_bytes') or d.get('total_bytes_estimate') or 1
         downloaded = d.get('downloaded_bytes', 0)
         percent = int((downloaded / total) * 100)
-        speed = d.get('speed', 0)
-        speed_str = f"{round(speed / 1024, 1)}KB/s" if speed else "0KB/s"
-
         update_status(download_id, {
             "status": "downloading",
             "progress": percent,
-            "speed": speed_str
+            "speed": d.get('speed') or 0,
+            "downloaded": downloaded,
+            "total": total
         })
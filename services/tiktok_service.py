@@ -3,7 +3,6 @@
 import os
 import time
 import yt_dlp
-import requests
 import traceback
 
 from selenium import webdriver
@@ -12,7 +11,10 @@ from selenium.webdriver.chrome.options import Options
 from config import VIDEO_DIR
 from utils.status_manager import update_status
 from utils.history_manager import save_to_history
-from utils.platform_helper import merge_headers_with_cookie
+from utils.platform_helper import merge_headers_with_cookie, canonical_video_key, cookie_profile
+from utils.failure_cache import PermanentFailure, remember_failure, get_cached_failure
+from utils.redirect_resolver import resolve_redirect_url
+from utils.segmented_downloader import download_ranged
 from breakers.tt_protection_breaker import extract_with_fallbacks
 
 DEFAULT_HEADERS = {
@@ -61,17 +63,23 @@ def extract_info_with_selenium(url, headers=None):
 
 
 def resolve_redirect(url: str) -> str:
-    try:
-        res = requests.get(url, allow_redirects=True, timeout=10, headers=DEFAULT_HEADERS)
-        return res.url
-    except Exception as e:
-        print(f"[TIKTOK] ⚠️ Redirect resolve error: {e}")
-        return url
+    return resolve_redirect_url(url, DEFAULT_HEADERS)
+
+
+def _failure_key(resolved_url, headers):
+    # Same shape as downloader.metadata_cache_key, so both paths share entries
+    return f"{canonical_video_key(resolved_url, 'tiktok')}|{cookie_profile(headers, 'tiktok')}"
 
 
 def fetch_tiktok_info(url: str, headers=None) -> dict:
+    failure_key = None
     try:
         resolved_url = resolve_redirect(url)
+        failure_key = _failure_key(resolved_url, headers)
+        cached_failure = get_cached_failure(failure_key)
+        if cached_failure:
+            return {"error": cached_failure, "cached": True}
+
         headers = merge_headers_with_cookie(headers or DEFAULT_HEADERS.copy(), "tiktok")
 
         info = extract_with_fallbacks(resolved_url, headers)
@@ -100,6 +108,10 @@ def fetch_tiktok_info(url: str, headers=None) -> dict:
             "sizes": sizes
         }
 
+    except PermanentFailure as e:
+        remember_failure(failure_key, "tiktok", e.reason)
+        return {"error": e.reason}
+
     except Exception as e:
         traceback.print_exc()
         return {"error": f"❌ TikTok info fetch failed: {e}"}
@@ -108,8 +120,17 @@ def fetch_tiktok_info(url: str, headers=None) -> dict:
 def download_tiktok(url: str, resolution: str, download_id: str, server_url: str, headers=None):
     try:
         resolved_url = resolve_redirect(url)
+        failure_key = _failure_key(resolved_url, headers)
+        cached_failure = get_cached_failure(failure_key)
+        if cached_failure:
+            raise Exception(cached_failure)
+
         headers = merge_headers_with_cookie(headers or DEFAULT_HEADERS.copy(), "tiktok")
-        info = extract_with_fallbacks(resolved_url, headers)
+        try:
+            info = extract_with_fallbacks(resolved_url, headers)
+        except PermanentFailure as e:
+            remember_failure(failure_key, "tiktok", e.reason)
+            raise Exception(e.reason)
 
         formats = info.get("formats", [])
         height = int(resolution.replace("p", ""))
@@ -132,15 +153,12 @@ def download_tiktok(url: str, resolution: str, download_id: str, server_url: str
         output_file = f"{download_id}.mp4"
         output_path = os.path.join(VIDEO_DIR, output_file)
 
-        r = requests.get(video_url, stream=True, timeout=30)
-        with open(output_path, "wb") as f:
-            downloaded = 0
-            total = int(r.headers.get("Content-Length", 0))
-            for chunk in r.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    _progress_hook_manual(downloaded, total, download_id)
+        download_ranged(
+            video_url,
+            output_path,
+            headers=selected.get("http_headers") or DEFAULT_HEADERS,
+            progress=lambda downloaded, total, speed: _progress_hook_manual(downloaded, total, download_id, speed)
+        )
 
         if not os.path.exists(output_path):
             raise Exception("❌ File not found after download")
@@ -148,7 +166,7 @@ def download_tiktok(url: str, resolution: str, download_id: str, server_url: str
         update_status(download_id, {
             "status": "completed",
             "progress": 100,
-            "speed": "0KB/s",
+            "speed": 0,
             "video_url": f"{server_url}/videos/{output_file}"
         })
 
@@ -165,16 +183,17 @@ def download_tiktok(url: str, resolution: str, download_id: str, server_url: str
         update_status(download_id, {
             "status": "error",
             "progress": 0,
-            "speed": "0KB/s",
+            "speed": 0,
             "error": str(e)
         })
 
 
-def _progress_hook_manual(downloaded, total, download_id):
+def _progress_hook_manual(downloaded, total, download_id, speed=0):
     percent = int((downloaded / total) * 100) if total else 0
-    speed = "N/A"
     update_status(download_id, {
         "status": "downloading",
         "progress": percent,
-        "speed": speed
+        "speed": speed or 0,
+        "downloaded": downloaded,
+        "total": total or 0
     })
@@ -12,11 +12,18 @@ from youtubesearchpython import VideosSearch
 from config import VIDEO_DIR, AUDIO_DIR, SERVER_URL
 from utils.platform_helper import (
     detect_platform,
+    canonical_video_key,
+    cookie_profile,
     merge_headers_with_cookie,
     get_cookie_file_for_platform
 )
 from utils.status_manager import update_status
 from utils.history_manager import save_to_history
+from utils.ydl_pool import pooled_ydl
+from utils.extraction_profiles import extraction_opts
+from utils.scheduler import download_scheduler, fragment_budget, PRIORITY_NORMAL
+from utils.bandwidth import bandwidth_governor
+from utils.metadata_store import store_get, store_set
 
 GLOBAL_PROXY = os.getenv("YTS_PROXY")
 
@@ -52,6 +59,13 @@ def map_language_code(code):
 
 def get_video_info(url: str, headers: dict = None) -> dict:
     platform = detect_platform(url)
+    store_key = f"ytsvc:{canonical_video_key(url, platform)}|{cookie_profile(headers, platform)}"
+
+    stored = store_get(store_key)
+    if stored:
+        print(f"[STORE ✅] Persistent metadata hit for {store_key}")
+        return {**stored, "video_url": url}
+
     merged_headers = merge_headers_with_cookie(headers or {}, platform)
     temp_cookie_path = None
 
@@ -70,13 +84,14 @@ def get_video_info(url: str, headers: dict = None) -> dict:
             'http_headers': merged_headers,
             'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best',
             'forcejson': True,
-            'dump_single_json': True
+            'dump_single_json': True,
+            **extraction_opts(platform, 'formats'),
         }
 
         if GLOBAL_PROXY:
             ydl_opts['proxy'] = GLOBAL_PROXY
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with pooled_ydl(ydl_opts, platform) as ydl:
             info = ydl.extract_info(url, download=False)
 
         if not info:
@@ -139,7 +154,7 @@ def get_video_info(url: str, headers: dict = None) -> dict:
                         "size": size_str
                     })
 
-        return {
+        result = {
             "platform": platform,
             "title": info.get("title", "Untitled"),
             "thumbnail": info.get("thumbnail", ""),
@@ -151,6 +166,9 @@ def get_video_info(url: str, headers: dict = None) -> dict:
             "audio_dubs": sorted(dubs, key=lambda d: d["label"])
         }
 
+        store_set(store_key, result)
+        return result
+
     except Exception as e:
         print(f"[❌ METADATA ERROR] {e}")
         traceback.print_exc()
@@ -162,9 +180,12 @@ def get_video_info(url: str, headers: dict = None) -> dict:
 
 # === PUBLIC DOWNLOAD ENTRYPOINT ===
 
-def download_youtube(url: str, format_id: str, is_audio=False, label="", headers: dict = None) -> str:
+def download_youtube(url: str, format_id: str, is_audio=False, label="", headers: dict = None,
+                     audio_format: str = "native") -> str:
     filename = generate_filename()
-    extension = 'mp3' if is_audio else 'mp4'
+    # Native audio keeps the stream's own container; the real extension is
+    # only known once yt-dlp has picked the format
+    extension = ('mp3' if audio_format == 'mp3' else '%(ext)s') if is_audio else 'mp4'
     selected_format = format_id or ('bestaudio' if is_audio else 'best')
     outdir = AUDIO_DIR if is_audio else VIDEO_DIR
     outurl = f"{SERVER_URL}/audios/{filename}.{extension}" if is_audio else f"{SERVER_URL}/videos/{filename}.{extension}"
@@ -178,12 +199,14 @@ def download_youtube(url: str, format_id: str, is_audio=False, label="", headers
         headers=headers,
         output_dir=outdir,
         file_url=outurl,
-        file_type='audio' if is_audio else 'video'
+        file_type='audio' if is_audio else 'video',
+        audio_format=audio_format
     )
 
 # === WORKER THREAD ===
 
-def _start_download(url, format_id, output_filename, label, audio_only, headers, output_dir, file_url, file_type):
+def _start_download(url, format_id, output_filename, label, audio_only, headers, output_dir, file_url, file_type,
+                    audio_format="native"):
     download_id = str(uuid.uuid4())
     output_path = os.path.join(output_dir, output_filename)
     platform = detect_platform(url)
@@ -199,12 +222,13 @@ def _start_download(url, format_id, output_filename, label, audio_only, headers,
         update_status(download_id, {
             "status": "starting",
             "progress": 0,
-            "speed": "0KB/s",
+            "speed": 0,
             "video_url": None,
             "file_type": file_type
         })
 
         try:
+            final_paths = []
             ydl_opts = {
                 'format': format_id,
                 'outtmpl': output_path,
@@ -212,34 +236,49 @@ def _start_download(url, format_id, output_filename, label, audio_only, headers,
                 'noplaylist': True,
                 'cookiefile': cookie_file,
                 'http_headers': merged_headers,
-                'progress_hooks': [lambda d: _progress_hook(d, download_id)]
+                'progress_hooks': [lambda d: _progress_hook(d, download_id)],
+                'post_hooks': [final_paths.append],
+                **extraction_opts(platform, 'download'),
             }
 
             if GLOBAL_PROXY:
                 ydl_opts['proxy'] = GLOBAL_PROXY
 
-            if audio_only:
+            if audio_only and audio_format == 'mp3':
                 ydl_opts['postprocessors'] = [{
                     'key': 'FFmpegExtractAudio',
                     'preferredcodec': 'mp3',
                     'preferredquality': '192',
                 }]
                 ydl_opts['merge_output_format'] = 'mp3'
+            elif audio_only:
+                # Skipped for files already in a common audio format,
+                # a stream copy out of the container otherwise
+                ydl_opts['postprocessors'] = [{
+                    'key': 'FFmpegExtractAudio',
+                    'preferredcodec': 'best',
+                }]
             else:
                 ydl_opts['merge_output_format'] = 'mp4'
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                print(f"[⏬ START] {output_filename} (format: {format_id})")
-                info = ydl.extract_info(url, download=True)
-
-            if not os.path.exists(output_path):
+            with fragment_budget.reserve(platform) as fragments, \
+                    bandwidth_governor.lease(download_id, platform, PRIORITY_NORMAL) as lease:
+                ydl_opts['concurrent_fragment_downloads'] = fragments
+                ydl_opts['progress_hooks'] = [lambda d: _progress_hook(d, download_id, lease)]
+                update_status(download_id, {"fragment_concurrency": fragments})
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    print(f"[⏬ START] {output_filename} (format: {format_id}, fragments: {fragments})")
+                    info = ydl.extract_info(url, download=True)
+
+            final_path = final_paths[-1] if final_paths else output_path
+            if not os.path.exists(final_path):
                 raise FileNotFoundError("❌ File not found after download.")
 
             update_status(download_id, {
                 "status": "completed",
                 "progress": 100,
-                "speed": "0KB/s",
-                "video_url": file_url,
+                "speed": 0,
+                "video_url": f"{file_url.rsplit('/', 1)[0]}/{os.path.basename(final_path)}",
                 "file_type": file_type
             })
 
@@ -248,7 +287,7 @@ def _start_download(url, format_id, output_filename, label, audio_only, headers,
                 "title": info.get("title", "Untitled"),
                 "resolution": label or format_id,
                 "status": "completed",
-                "size": round(os.path.getsize(output_path) / 1024 / 1024, 2),
+                "size": round(os.path.getsize(final_path) / 1024 / 1024, 2),
                 "is_audio": audio_only
             })
 
@@ -260,7 +299,7 @@ def _start_download(url, format_id, output_filename, label, audio_only, headers,
             update_status(download_id, {
                 "status": "error",
                 "progress": 0,
-                "speed": "0KB/s",
+                "speed": 0,
                 "error": str(e),
                 "file_type": file_type
             })
@@ -269,25 +308,27 @@ def _start_download(url, format_id, output_filename, label, audio_only, headers,
             if temp_cookie_path and os.path.exists(temp_cookie_path):
                 os.remove(temp_cookie_path)
 
-    threading.Thread(target=run, daemon=True).start()
+    download_scheduler.submit(download_id, platform, run)
     return download_id
 
 # === PROGRESS TRACKER ===
 
-def _progress_hook(d, download_id):
+def _progress_hook(d, download_id, lease=None):
     if d.get("status") != "downloading":
         return
 
     total = d.get("total_bytes") or d.get("total_bytes_estimate") or 1
     downloaded = d.get("downloaded_bytes", 0)
+    if lease:
+        lease.account(downloaded, d.get("filename"))  # sleeps here when over its bandwidth share
     percent = int((downloaded / total) * 100)
-    speed = d.get("speed", 0)
-    speed_str = f"{round(speed / 1024, 1)}KB/s" if speed else "0KB/s"
 
     update_status(download_id, {
         "status": "downloading",
         "progress": percent,
-        "speed": speed_str
+        "speed": d.get("speed") or 0,
+        "downloaded": downloaded,
+        "total": total
     })
 def search_youtube(query, limit=100):
     all_results = []
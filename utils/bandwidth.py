@@ -0,0 +1,140 @@
+# 📁 utils/bandwidth.py
+#
+# Process-wide bandwidth budget. Every active download holds a lease whose
+# rate is its weighted share of BANDWIDTH_TOTAL; shares are recomputed each
+# time a download starts or finishes. Downloads are slowed by sleeping in
+# their progress path, the same way yt-dlp applies its own ratelimit.
+#
+# Only ingress (fetching from the platforms) is governed. Files served from
+# /videos, /audios and /stream go out unthrottled; limit those at the proxy
+# (e.g. NGINX limit_rate) if egress needs a budget too.
+
+import threading
+import time
+from contextlib import contextmanager
+
+from config import BANDWIDTH_TOTAL, BANDWIDTH_PLATFORM_WEIGHTS, BANDWIDTH_PRIORITY_WEIGHTS
+
+BURST_SECONDS = 1.0  # unused share a job may save up
+MAX_SLEEP = 2.0      # keep hooks responsive to cancel / pause
+
+
+class _Lease:
+    """One job's token bucket. rate is None when the job is not limited."""
+
+    def __init__(self, job_id, platform, weight, cap=None):
+        self.job_id = job_id
+        self.platform = platform
+        self.weight = weight
+        self.cap = cap
+        self.rate = cap
+        self.transferred = 0
+        self._tokens = 0.0
+        self._stamp = time.monotonic()
+        self._last_totals = {}  # file -> highest cumulative count seen
+        self._lock = threading.Lock()
+
+    def consume(self, nbytes):
+        """Blocks until this job is allowed to have moved nbytes more."""
+        if nbytes <= 0:
+            return
+        with self._lock:
+            self.transferred += nbytes
+            rate = self.rate
+            if not rate:
+                return
+            now = time.monotonic()
+            self._tokens = min(self._tokens + (now - self._stamp) * rate, rate * BURST_SECONDS)
+            self._stamp = now
+            self._tokens -= nbytes
+            delay = -self._tokens / rate
+        if delay > 0:
+            time.sleep(min(delay, MAX_SLEEP))
+
+    def account(self, total_bytes, key=None):
+        """
+        consume() for cumulative counters such as yt-dlp's downloaded_bytes,
+        tracked per key (the file being written). Concurrent fragment
+        threads report out of order, so a smaller total is a late report,
+        not a new file, and charges nothing. The first total seen for a key
+        is the baseline, so a resumed .part is not charged again.
+        """
+        with self._lock:
+            last = self._last_totals.get(key)
+            if last is None or total_bytes <= last:
+                self._last_totals[key] = max(total_bytes, last or 0)
+                return
+            self._last_totals[key] = total_bytes
+        self.consume(total_bytes - last)
+
+
+class BandwidthGovernor:
+    def __init__(self, total=0, platform_weights=None, priority_weights=None):
+        self.total = total
+        self.platform_weights = platform_weights or {}
+        self.priority_weights = priority_weights or {}
+        self._leases = {}
+        self._lock = threading.Lock()
+
+    def _weight(self, platform, priority):
+        return self.platform_weights.get(platform, 1.0) * self.priority_weights.get(priority, 1.0)
+
+    def _rebalance(self):
+        # Water-filling: jobs capped below their share get the cap, the
+        # rest split what is left by weight.
+        leases = list(self._leases.values())
+        if not self.total:
+            for lease in leases:
+                lease.rate = lease.cap
+            return
+
+        remaining = self.total
+        while leases:
+            weight_sum = sum(lease.weight for lease in leases) or 1.0
+            capped = [l for l in leases if l.cap and l.cap <= remaining * l.weight / weight_sum]
+            if not capped:
+                for lease in leases:
+                    lease.rate = remaining * lease.weight / weight_sum
+                return
+            for lease in capped:
+                lease.rate = lease.cap
+                remaining -= lease.cap
+                leases.remove(lease)
+
+    @contextmanager
+    def lease(self, job_id, platform, priority, cap=None):
+        """Yields the job's _Lease for as long as it is transferring."""
+        lease = _Lease(job_id, platform, self._weight(platform, priority), cap)
+        with self._lock:
+            self._leases[job_id] = lease
+            self._rebalance()
+        try:
+            yield lease
+        finally:
+            with self._lock:
+                if self._leases.get(job_id) is lease:
+                    del self._leases[job_id]
+                self._rebalance()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "total_bytes_per_sec": self.total or None,
+                "active": len(self._leases),
+                "shares": {
+                    job_id: {
+                        "platform": lease.platform,
+                        "weight": lease.weight,
+                        "rate": round(lease.rate) if lease.rate else None,
+                        "transferred": lease.transferred,
+                    }
+                    for job_id, lease in self._leases.items()
+                },
+            }
+
+
+bandwidth_governor = BandwidthGovernor(
+    total=BANDWIDTH_TOTAL,
+    platform_weights=BANDWIDTH_PLATFORM_WEIGHTS,
+    priority_weights=BANDWIDTH_PRIORITY_WEIGHTS,
+)
@@ -0,0 +1,106 @@
+import json
+from collections import OrderedDict
+from threading import Lock
+from time import time
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with per-entry TTL, an entry/byte bound and
+    LRU eviction. Sizes are approximated from the JSON encoding of each value.
+    """
+
+    def __init__(self, ttl_seconds=300, max_entries=1024, max_bytes=None, name="cache"):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.name = name
+        self._data = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _sizeof(value) -> int:
+        try:
+            return len(json.dumps(value, default=str))
+        except Exception:
+            return 1024
+
+    def _drop(self, key):
+        entry = self._data.pop(key, None)
+        if entry:
+            self._bytes -= entry[1]
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            if entry[0] <= time():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key, value, ttl_seconds=None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl <= 0:
+            return
+
+        size = self._sizeof(value)
+        if self.max_bytes and size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._drop(key)
+            self._data[key] = (time() + ttl, size, value)
+            self._bytes += size
+
+            while self._data and (
+                len(self._data) > self.max_entries
+                or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                oldest = next(iter(self._data))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            self._drop(key)
+            return entry[2] if entry else default
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -5,8 +5,10 @@ import json
 from datetime import datetime, timedelta
 from config import VIDEO_DIR, AUDIO_DIR
 from utils.history_manager import HISTORY_FILE
+from utils.media_store import indexed_paths, enforce_disk_budget
 
-# Delete files older than this
+# Delete unindexed files (partials, orphans) older than this. Indexed media is
+# evicted LRU by the media store's disk budget instead.
 DELETE_AFTER = timedelta(days=1)
 
 # Run cleanup every hour
@@ -20,6 +22,9 @@ def cleanup_old_files():
     while True:
         for directory in TARGET_DIRS:
             run_cleanup_once(directory)
+        freed = enforce_disk_budget()
+        if freed:
+            print(f"[CLEANUP] 💾 Disk budget freed {round(freed / 1024 / 1024, 2)} MB")
         clean_history_file()
         time.sleep(CLEANUP_INTERVAL)
 
@@ -29,6 +34,7 @@ def run_cleanup_once(directory):
     deleted_dirs = 0
     total_size_freed = 0
     type_counts = {}
+    indexed = indexed_paths()
 
     print(f"\n[CLEANUP] 🔍 Scanning: {directory}")
 
@@ -38,7 +44,7 @@ def run_cleanup_once(directory):
             for file in files:
                 file_path = os.path.join(root, file)
                 try:
-                    if not os.path.isfile(file_path):
+                    if not os.path.isfile(file_path) or os.path.abspath(file_path) in indexed:
                         continue
 
                     modified = datetime.fromtimestamp(os.path.getmtime(file_path))
@@ -10,15 +10,47 @@ import tempfile
 import time
 import mimetypes
 import json
+import hashlib
+import requests
+import copy
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
 from youtubesearchpython import VideosSearch
 
-from config import VIDEO_DIR, SERVER_URL
+from config import (
+    VIDEO_DIR,
+    SERVER_URL,
+    ENABLE_METADATA_CACHE,
+    METADATA_CACHE_TTL,
+    METADATA_CACHE_MAX_ENTRIES,
+    METADATA_CACHE_MAX_BYTES,
+    INFO_CACHE_MAX_ENTRIES,
+    INFO_CACHE_MAX_BYTES,
+    BATCH_MAX_WORKERS,
+    BATCH_TIMEOUT,
+    SEGMENTED_PLATFORMS,
+)
+from utils.cache import TTLCache
+from utils.ydl_pool import pooled_ydl, PoolExhausted
+from utils.extraction_profiles import extraction_opts
+from utils.scheduler import download_scheduler, fragment_budget, PRIORITY_HIGH, PRIORITY_NORMAL
+from utils.bandwidth import bandwidth_governor
+from utils.media_store import media_key, lookup_media, register_media
+from utils.segmented_downloader import download_ranged, direct_download_target, DownloadPaused
+from utils.live_stream import LiveFile
+from utils.postprocess_planner import plan_postprocessing, plan_audio, PATH_NONE
+from utils.metadata_store import store_get, store_set, store_delete
+from utils.redirect_resolver import is_short_link, resolve_redirect_url
+from utils.failure_cache import classify_failure, remember_failure, get_cached_failure
 from utils.platform_helper import (
     detect_platform,
+    canonical_video_key,
+    extract_video_id,
+    cookie_profile,
     merge_headers_with_cookie,
     get_cookie_file_for_platform
 )
 from utils.status_manager import update_status
+from utils.job_registry import job_registry
 from utils.history_manager import save_to_history
 from services.tiktok_service import extract_info_with_selenium
 
@@ -28,46 +60,65 @@ AUDIO_DIR = 'static/audios'
 os.makedirs(AUDIO_DIR, exist_ok=True)
 # ...
 
-# --- Save as Audio (MP3) Download ---
+# --- Save as Audio Download ---
+# Native mode hands out the platform's own audio stream (AAC/m4a preferred,
+# Opus otherwise) without re-encoding; MP3 is only produced on request.
+
+AUDIO_FORMATS = ("native", "mp3")
 
-def start_audio_download(url, headers=None, audio_quality='192'):
+def start_audio_download(url, headers=None, audio_quality='192', audio_format='native'):
+    if audio_format not in AUDIO_FORMATS:
+        raise ValueError(f"Unsupported audio format: {audio_format}")
+    want_mp3 = audio_format == "mp3"
     download_id = str(uuid.uuid4())
     filename = generate_filename(prefix="audio")
-    output_path = os.path.join(AUDIO_DIR, f"{filename}.mp3")
+    # The extension depends on the stream yt-dlp picks; post_hooks report it
+    output_template = os.path.join(AUDIO_DIR, f"{filename}.%(ext)s")
     platform = detect_platform(url)
-    cancel_event = threading.Event()
-    _download_locks[download_id] = cancel_event
+
+    if want_mp3:
+        # Try to prefer matching abr, else fallback to bestaudio
+        format_selector = f"bestaudio[abr={audio_quality}]/bestaudio/best"
+        media_format = f"{format_selector}|mp3@{audio_quality}"
+    else:
+        # m4a plays everywhere (including iOS); anything else is stream-copied
+        format_selector = "bestaudio[ext=m4a]/bestaudio/best"
+        media_format = f"{format_selector}|native"
+
+    video_id = _media_identity(url, platform)
+    stored_key = media_key(platform, video_id, media_format, "audio")
+    if _serve_existing_media(download_id, stored_key, "audio_url", "audios"):
+        return download_id
+
+    job, started = _join_or_start(f"{platform}:{video_id or url}|{media_format}|audio", download_id)
+    if not started:
+        return download_id
 
     def run():
-        update_status(download_id, {
+        job.publish({
             "status": "starting",
             "progress": 0,
-            "speed": "0KB/s",
-            "audio_url": None
+            "speed": 0,
+            "audio_url": None,
+            "file_type": "audio"
         })
 
+        cache_key = None
         try:
             merged_headers = merge_headers_with_cookie(headers or {}, platform)
-            cookie_file = _prepare_cookie_file(headers, platform)
-
-            # Try to prefer matching abr, else fallback to bestaudio
-            abr_format = f"bestaudio[abr={audio_quality}]"
-            fallback_format = "bestaudio"
-            format_selector = f"{abr_format}/{fallback_format}"
+            cookie_file = _prepare_cookie_file(headers, platform, job.owner_id)
+            final_paths = []
 
             ydl_opts = {
                 'format': format_selector,
-                'outtmpl': output_path,
+                'outtmpl': output_template,
                 'quiet': True,
                 'noplaylist': True,
-                'merge_output_format': 'mp3',
                 'http_headers': merged_headers,
-                'progress_hooks': [lambda d: _progress_hook(d, download_id, cancel_event)],
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': audio_quality,
-                }],
+                'progress_hooks': [lambda d: _progress_hook(d, job)],
+                'postprocessor_hooks': [lambda d: _postprocess_hook(d, job)],
+                'post_hooks': [final_paths.append],
+                **extraction_opts(platform, 'download'),
             }
 
             if cookie_file:
@@ -75,36 +126,55 @@ def start_audio_download(url, headers=None, audio_quality='192'):
             if GLOBAL_PROXY:
                 ydl_opts['proxy'] = GLOBAL_PROXY
 
+            cache_key, info = _reusable_info(url, headers, platform)
+
             start_time = time.time()
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                print(f"[AUDIO DL] 🎵 Downloading audio from {url} (quality: {audio_quality}K)")
-                result = ydl.download([url])
+            with fragment_budget.reserve(platform) as fragments, \
+                    bandwidth_governor.lease(job.owner_id, platform, PRIORITY_HIGH) as job.lease:
+                ydl_opts['concurrent_fragment_downloads'] = fragments
+                job.publish({"fragment_concurrency": fragments})
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    print(f"[AUDIO DL] 🎵 Downloading {audio_format} audio from {url} (fragments: {fragments})")
+                    _run_ydl_download(ydl, url, cache_key, info, direct=_audio_direct(job, want_mp3, audio_quality))
             elapsed = time.time() - start_time
-            print(f"[AUDIO DL] ✅ Finished in {round(elapsed, 2)}s")
+            if job.postprocess:
+                job.pp_seconds["download"] = round(elapsed - sum(job.pp_seconds.values()), 2)
+                job.publish({"postprocess": _postprocess_report(job)})
+            print(f"[AUDIO DL] ✅ Finished in {round(elapsed, 2)}s {job.pp_seconds}")
 
-            if cancel_event.is_set():
-                update_status(download_id, {"status": "cancelled"})
+            if job.cancel_event.is_set():
+                job.publish({"status": "cancelled"})
                 return
 
-            if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+            output_path = final_paths[-1] if final_paths else None
+            if not output_path or not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
                 raise FileNotFoundError("Audio download succeeded but file not found or empty.")
 
-            update_status(download_id, {
+            job.publish({
                 "status": "completed",
                 "progress": 100,
-                "speed": "0KB/s",
+                "speed": 0,
+                "downloaded": os.path.getsize(output_path),
+                "total": os.path.getsize(output_path),
                 "audio_url": f"{SERVER_URL}/audios/{os.path.basename(output_path)}"
             })
+            register_media(stored_key, platform, video_id, media_format, "audio", output_path)
 
             save_to_history({
                 "id": download_id,
                 "title": os.path.basename(output_path),
-                "resolution": f"{audio_quality}K",
+                "resolution": f"{audio_quality}K" if want_mp3 else "native",
                 "status": "completed",
                 "size": round(os.path.getsize(output_path) / 1024 / 1024, 2)
             })
 
+        except DownloadPaused:
+            raise  # parked by the shared-job wrapper
+
         except yt_dlp.utils.DownloadError as e:
+            permanent, reason = classify_failure(e)
+            if permanent and cache_key:
+                _forget_metadata(cache_key, platform, reason)  # cached metadata outlived the video
             msg = str(e).lower()
             error_msg = (
                 "❌ Format not available for selected quality." if "requested format not available" in msg else
@@ -112,16 +182,15 @@ def start_audio_download(url, headers=None, audio_quality='192'):
                 "❌ Audio download failed."
             )
             print(f"[AUDIO DL ❌] {e}")
-            update_status(download_id, {"status": "error", "error": error_msg})
+            job.publish({"status": "error", "error": error_msg})
 
         except Exception as e:
             print(f"[AUDIO ERROR ❌] {e}")
             traceback.print_exc()
-            update_status(download_id, {"status": "error", "error": "❌ Audio download failed unexpectedly."})
+            job.publish({"status": "error", "error": "❌ Audio download failed unexpectedly."})
+
 
-    thread = threading.Thread(target=run, daemon=True)
-    _download_threads[download_id] = thread
-    thread.start()
+    _submit_shared_job(job, platform, run, PRIORITY_HIGH)  # audio jobs are short and cheap
     return download_id
 
 
@@ -129,8 +198,6 @@ def start_audio_download(url, headers=None, audio_quality='192'):
 
 # Proxy setup
 GLOBAL_PROXY = os.getenv("YTS_PROXY") or None
-_download_threads = {}
-_download_locks = {}
 
 # Constants
 TEMP_COOKIE_SUFFIX = "_cookie.txt"
@@ -140,16 +207,222 @@ MAX_RETRIES = 3
 
 # --- Utility Functions ---
 
+def _submit_job(download_id, platform, run, priority):
+    """
+    Queues a download on the shared scheduler. Raises QueueFull (→ HTTP 429)
+    when the queue is at capacity.
+    """
+    cancel_event = job_registry.cancel_event(download_id)
+
+    def guarded():
+        if cancel_event and cancel_event.is_set():
+            return
+        job_registry.bind_thread(download_id, threading.current_thread())
+        try:
+            run()
+        finally:
+            job_registry.bind_thread(download_id, None)
+
+    try:
+        download_scheduler.submit(download_id, platform, guarded, priority)
+    except Exception:
+        job_registry.discard(download_id)
+        raise
+
+# --- Shared In-flight Downloads ---
+
+class _SharedJob:
+    """
+    One running download and every download_id attached to it. Status is
+    mirrored to all subscribers; the download only stops (or pauses) once
+    every subscriber has cancelled (or paused).
+
+    subscribers is a frozenset replaced (under _shared_lock) on join and
+    cancel, so publish never needs the process-wide lock: progress ticks
+    only take this job's own status_lock.
+    """
+
+    def __init__(self, join_key, owner_id):
+        self.join_key = join_key
+        self.owner_id = owner_id  # the id the scheduler knows the job by
+        self.subscribers = frozenset((owner_id,))
+        self.status_lock = threading.Lock()  # orders last_status and the writes to subscribers
+        self.cancel_event = threading.Event()
+        self.pause_event = threading.Event()
+        self.paused_by = set()
+        self.paused = False  # True once the worker has let go of the job
+        self.last_status = {}
+        self.platform = None
+        self.run = None
+        self.priority = PRIORITY_NORMAL
+        self.live = None  # LiveFile for /stream, video jobs only
+        self.lease = None  # bandwidth share while transferring
+        self.postprocess = None  # {"path", "reason"} once the format is known
+        self.pp_seconds = {}     # ffmpeg step / "download" -> seconds
+        self.pp_started = {}
+
+    def publish(self, data):
+        with self.status_lock:
+            self.last_status.update(data)
+            for download_id in self.subscribers:
+                update_status(download_id, data)
+
+_shared_jobs = {}    # join key -> _SharedJob
+_subscriptions = {}  # download_id -> _SharedJob
+_shared_lock = threading.Lock()
+
+def _join_or_start(join_key, download_id):
+    """
+    Attaches download_id to a running job for the same media, or registers a
+    new one. Returns (job, started); the caller only runs the job if started.
+    """
+    with _shared_lock:
+        job = _shared_jobs.get(join_key)
+        if job is None:
+            job = _SharedJob(join_key, download_id)
+            _shared_jobs[join_key] = job
+            _subscriptions[download_id] = job
+            job_registry.register(download_id, cancel_event=job.cancel_event)
+            return job, True
+
+        job.subscribers = job.subscribers | {download_id}
+        _subscriptions[download_id] = job
+        job_registry.register(download_id, cancel_event=job.cancel_event)
+
+    print(f"[SHARED DL 🔗] {download_id} joined {job.owner_id} ({len(job.subscribers)} subscribers)")
+    with job.status_lock:
+        # Under the job's lock, so a newer publish cannot be overwritten by this snapshot
+        update_status(download_id, dict(job.last_status) or {"status": "queued", "progress": 0, "speed": 0})
+    return job, False
+
+def _finish_shared(job):
+    """Detaches a finished job so later requests go through the media store."""
+    if job.live:
+        job.live.finish(ok=job.last_status.get("status") == "completed")
+    with _shared_lock:
+        if _shared_jobs.get(job.join_key) is job:
+            del _shared_jobs[job.join_key]
+        for download_id in job.subscribers:
+            _subscriptions.pop(download_id, None)
+            job_registry.finish(download_id)
+
+def _submit_shared_job(job, platform, run, priority):
+    def shared_run():
+        paused = False
+        try:
+            run()
+        except DownloadPaused:
+            paused = True
+        finally:
+            if not paused:
+                _finish_shared(job)
+        if paused:
+            _park_paused(job)
+
+    job.platform, job.run, job.priority = platform, shared_run, priority  # kept for resume
+    try:
+        _submit_job(job.owner_id, platform, shared_run, priority)
+    except Exception:
+        _finish_shared(job)
+        raise
+
+def _requeue(job):
+    print(f"[RESUME] ▶️ Re-queuing {job.owner_id}")
+    try:
+        _submit_job(job.owner_id, job.platform, job.run, job.priority)
+    except Exception:
+        with _shared_lock:
+            job.paused = True
+            job.pause_event.set()
+        job.publish({"status": "paused", "speed": 0})
+        raise
+
+def _park_paused(job):
+    """Called once a pause has stopped the worker, which is now free."""
+    with _shared_lock:
+        resumed = not job.pause_event.is_set()  # resume arrived while stopping
+        job.paused = not resumed
+    if not resumed:
+        print(f"[PAUSE ⏸️] {job.owner_id} paused; partial files kept")
+        job.publish({"status": "paused", "speed": 0})
+        return
+    try:
+        _requeue(job)
+    except Exception as e:
+        print(f"[RESUME ❌] Could not re-queue {job.owner_id}: {e}")
+
+def _media_identity(url, platform):
+    if is_short_link(url):
+        url = resolve_redirect_url(url)
+    return extract_video_id(url, platform)
+
+def _serve_existing_media(download_id, stored_key, url_field, subdir):
+    """
+    Completes download_id instantly if the same media is already on disk.
+    """
+    existing = lookup_media(stored_key)
+    if not existing:
+        return False
+
+    filename = os.path.basename(existing["path"])
+    print(f"[MEDIA STORE ✅] Reusing {filename} for {stored_key}")
+    update_status(download_id, {
+        "status": "completed",
+        "progress": 100,
+        "speed": 0,
+        url_field: f"{SERVER_URL}/{subdir}/{filename}",
+        "filename": filename
+    })
+    job_registry.register(download_id)
+    job_registry.finish(download_id)
+    return True
+
 def generate_filename(prefix="YTSx"):
     return f"{prefix}_{''.join(random.choices(string.ascii_lowercase + string.digits, k=12))}"
 
-def _prepare_cookie_file(headers, platform):
+_cookie_dir = None
+_cookie_dir_lock = threading.Lock()
+
+def _private_cookie_dir():
+    # mkdtemp creates the directory 0700 under an unpredictable name, so other
+    # users can neither read the cookies nor plant files in it
+    global _cookie_dir
+    with _cookie_dir_lock:
+        if _cookie_dir is None or not os.path.isdir(_cookie_dir):
+            _cookie_dir = tempfile.mkdtemp(prefix="yts_cookies_", dir=tempfile.gettempdir())
+        return _cookie_dir
+
+def _write_private_file(path, content):
+    """Writes content 0600 under a temp name and moves it into place whole."""
+    if os.path.exists(path):
+        return
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return  # another request is writing the same cookie
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)  # readers see either no file or the whole file
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _prepare_cookie_file(headers, platform, download_id=None):
     if headers and "Cookie" in headers:
-        temp = tempfile.NamedTemporaryFile(delete=False, suffix=TEMP_COOKIE_SUFFIX, mode='w')
-        temp.write(headers["Cookie"])
-        temp.close()
-        print(f"[COOKIES] ✨ Using header-based cookie file: {temp.name}")
-        return temp.name
+        # Same cookie -> same path, so pooled yt-dlp instances can be reused
+        digest = hashlib.sha1(headers["Cookie"].encode("utf-8")).hexdigest()[:16]
+        path = os.path.join(_private_cookie_dir(), f"yts_{digest}{TEMP_COOKIE_SUFFIX}")
+        if download_id:
+            # Claimed before writing, so the reaper cannot remove it in between
+            job_registry.add_temp_file(download_id, path)  # removed once no job uses it
+        _write_private_file(path, headers["Cookie"])
+        print(f"[COOKIES] ✨ Using header-based cookie file: {path}")
+        return path
 
     fallback = get_cookie_file_for_platform(platform)
     if fallback:
@@ -159,26 +432,450 @@ def _prepare_cookie_file(headers, platform):
     print(f"[COOKIES] ⚠️ No cookie used for platform: {platform}")
     return None
 
+# --- Metadata Cache ---
+
+_metadata_cache = TTLCache(
+    ttl_seconds=METADATA_CACHE_TTL,
+    max_entries=METADATA_CACHE_MAX_ENTRIES,
+    max_bytes=METADATA_CACHE_MAX_BYTES,
+    name="metadata",
+)
+
+def metadata_cache_key(url, headers=None, platform=None):
+    # Results can differ per login (age/region gated formats), so the cookie
+    # profile is part of the key.
+    platform = platform or detect_platform(url)
+    if is_short_link(url):
+        url = resolve_redirect_url(url)
+    return f"{canonical_video_key(url, platform)}|{cookie_profile(headers, platform)}"
+
+def get_metadata_cache_stats():
+    stats = _metadata_cache.stats()
+    stats["enabled"] = ENABLE_METADATA_CACHE
+    stats["info_dicts"] = _info_cache.stats()
+    return stats
+
+# --- Info Dict Reuse (download without re-extracting) ---
+
+# Full sanitized yt-dlp info_dicts, kept only while their signed URLs are valid
+_info_cache = TTLCache(
+    ttl_seconds=METADATA_CACHE_TTL,
+    max_entries=INFO_CACHE_MAX_ENTRIES,
+    max_bytes=INFO_CACHE_MAX_BYTES,
+    name="info_dict",
+)
+
+INFO_REUSE_MARGIN = 120  # seconds of validity a signed URL must still have
+
+def _signed_url_expiry(info):
+    expiries = []
+    for f in info.get("formats") or [info]:
+        furl = f.get("url") or ""
+        # YouTube: expire=<epoch>, TikTok: x-expires=<epoch>, Facebook/Instagram: oe=<hex epoch>
+        match = re.search(r'[?&/]expire[=/](\d{10})', furl) or re.search(r'[?&]x-expires=(\d{10})', furl)
+        if match:
+            expiries.append(int(match.group(1)))
+            continue
+        match = re.search(r'[?&]oe=([0-9A-Fa-f]{8})', furl)
+        if match:
+            expiries.append(int(match.group(1), 16))
+    return min(expiries) if expiries else None
+
+def _remember_info(cache_key, info):
+    ttl = METADATA_CACHE_TTL
+    expiry = _signed_url_expiry(info)
+    if expiry:
+        ttl = min(ttl, int(expiry - time.time() - INFO_REUSE_MARGIN))
+    _info_cache.set(cache_key, info, ttl_seconds=ttl)
+
+def _reusable_info(url, headers, platform):
+    """
+    Returns the cached info_dict for this URL, if its format URLs are still
+    valid. Reuse is keyed by the URL and cookie profile, the same key
+    /fetch_info stored it under, so clients need not pass anything back.
+    """
+    cache_key = metadata_cache_key(url, headers, platform)
+    return cache_key, _info_cache.get(cache_key)
+
+def _run_ydl_download(ydl, url, cache_key=None, info=None, direct=None):
+    """
+    direct(ydl, selected) may take over the download of a resolved format;
+    it returns False to leave it to yt-dlp.
+    """
+    if info:
+        try:
+            print(f"[REUSE ✅] Processing cached info_dict for {cache_key} (no re-extraction)")
+            _process_selected(ydl, copy.deepcopy(info), direct)
+            return
+        except yt_dlp.utils.DownloadError as e:
+            # Usually an expired or revoked signed URL — extract fresh ones
+            print(f"[REUSE ⚠️] Cached info failed, re-extracting: {e}")
+            _info_cache.pop(cache_key)
+    if is_short_link(url):
+        url = resolve_redirect_url(url)  # cached; spares yt-dlp the redirect extractor
+    # Keep the fresh extraction, so a resume after pause skips it while the
+    # signed URLs are still valid
+    video = _resolve_video(ydl, ydl.extract_info(url, download=False, process=False))
+    if cache_key:
+        _remember_info(cache_key, ydl.sanitize_info(video))
+    _process_selected(ydl, video, direct)
+
+MAX_URL_HOPS = 5
+
+def _resolve_video(ydl, ie_result):
+    """
+    Follows url / url_transparent results (short-link and embed extractors)
+    down to the video itself, without processing formats, the same way
+    yt-dlp's process_ie_result does. Each hop is extracted once.
+    """
+    for _ in range(MAX_URL_HOPS):
+        result_type = ie_result.get("_type", "video")
+        if result_type not in ("url", "url_transparent"):
+            return ie_result
+        inner = ydl.extract_info(ie_result["url"], ie_key=ie_result.get("ie_key"), download=False, process=False)
+        if result_type == "url_transparent":
+            # Fields from the embedding page win, as in yt-dlp
+            exempt = {"_type", "url", "ie_key", "id", "extractor", "extractor_key"}
+            inner = {**inner, **{k: v for k, v in ie_result.items() if v is not None and k not in exempt}}
+        ie_result = inner
+    raise yt_dlp.utils.DownloadError(f"Too many redirects resolving {ie_result.get('url')}")
+
+def _process_selected(ydl, video, direct):
+    """
+    Selects formats once and downloads the selection; the video is not
+    processed a second time for the download.
+    """
+    if video.get("_type", "video") != "video":
+        ydl.process_ie_result(video, download=True)  # playlists and the like
+        return
+    selected = ydl.process_ie_result(video, download=False)
+    if direct and direct(ydl, selected):
+        return
+    ydl.process_info(selected)
+
+def _audio_direct(job, want_mp3, audio_quality):
+    """Attaches the audio ffmpeg step, if any, once the stream is known."""
+    def direct(ydl, selected):
+        plan = plan_audio(selected, want_mp3, audio_quality)
+        for pp_class, kwargs in plan["postprocessors"]:
+            ydl.add_post_processor(pp_class(ydl, **kwargs), when='post_process')
+        job.postprocess = {"path": plan["path"], "reason": plan["reason"]}
+        job.publish({"postprocess": _postprocess_report(job)})
+        print(f"[POSTPROCESS] 🧭 {job.owner_id}: {plan['path']} ({plan['reason']})")
+        return False
+    return direct
+
+def _video_direct(output_path, job, segmented):
+    """
+    Runs once yt-dlp has picked the format. Attaches only the ffmpeg steps
+    the codecs need; untouched single HTTP(S) mp4 files of known size
+    become followable through /stream; plain HTTP(S) files on segmented platforms are fetched over
+    parallel ranged connections.
+    """
+    def direct(ydl, selected):
+        plan = plan_postprocessing(selected, "mp4")
+        for pp_class, kwargs in plan["postprocessors"]:
+            ydl.add_post_processor(pp_class(ydl, **kwargs), when='post_process')
+        job.postprocess = {"path": plan["path"], "reason": plan["reason"]}
+        job.publish({"postprocess": _postprocess_report(job)})
+        print(f"[POSTPROCESS] 🧭 {job.owner_id}: {plan['path']} ({plan['reason']})")
+
+        followable = (
+            not selected.get("requested_formats")
+            and plan["path"] == PATH_NONE  # otherwise the final file only exists after ffmpeg
+            and selected.get("protocol") in ("http", "https")  # HLS parts are MPEG-TS until fixed up
+            and selected.get("ext") == "mp4"
+        )
+        target = direct_download_target(ydl, selected) if segmented and followable else None
+        if not target:
+            size = selected.get("filesize")  # filesize_approx would be a wrong Content-Length
+            if followable and size:
+                job.live.start(size=size)
+            else:
+                job.live.unsupported()
+            return False
+
+        print(f"[SEGMENTED DL] ⚡ Direct file for {selected.get('format_id')}, bypassing yt-dlp downloader")
+        download_ranged(
+            output_path=output_path,
+            cancel_event=job.cancel_event,
+            pause_event=job.pause_event,
+            on_start=lambda size, watermark: (
+                job.live.start(size=size, watermark=watermark) if size else job.live.unsupported()
+            ),
+            progress=lambda done, total, speed: _publish_progress(job, done, total, speed),
+            throttle=job.lease.consume if job.lease else None,
+            **target
+        )
+        return True
+    return direct
+
+# --- Single-Flight Coalescing ---
+
+class MetadataError(Exception):
+    """Extraction or parsing failed; the message is safe to return to clients."""
+
+
+class MetadataBusy(MetadataError):
+    """No yt-dlp slot was free; the client should retry later."""
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def _single_flight(key, fn):
+    """
+    Runs fn() once per key at a time. Concurrent callers with the same key
+    block on the leader and receive the same result or the same exception.
+    """
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        is_leader = flight is None
+        if is_leader:
+            flight = _Flight()
+            _inflight[key] = flight
+        else:
+            flight.waiters += 1
+
+    if not is_leader:
+        print(f"[SINGLE-FLIGHT] ⏳ Joining in-flight extraction for {key}")
+        flight.done.wait()
+        if flight.error:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = fn()
+        return flight.result
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        if flight.waiters:
+            print(f"[SINGLE-FLIGHT] ✅ Shared result with {flight.waiters} waiting request(s) for {key}")
+        flight.done.set()
+
 # --- Metadata Extraction ---
 
 def extract_metadata(url, headers=None, download_id=None):
     if not download_id:
         download_id = str(uuid.uuid4())
 
-    cancel_event = threading.Event()
-    _download_locks[download_id] = cancel_event
+    job_registry.register(download_id, kind="metadata")
+    try:
+        return _extract_metadata(url, headers, download_id)
+    finally:
+        job_registry.finish(download_id)
 
+def _extract_metadata(url, headers, download_id):
     update_status(download_id, {
         "status": "extracting",
         "progress": 0,
-        "speed": "0KB/s",
+        "speed": 0,
     })
 
     platform = detect_platform(url)
+    cache_key = metadata_cache_key(url, headers, platform)
+
+    cached = _lookup_cached_metadata(cache_key)
+    if cached:
+        return _metadata_ready(download_id, cached, url)
+
+    cached_failure = get_cached_failure(cache_key)
+    if cached_failure:
+        print(f"[NEGATIVE CACHE ✅] {cache_key}: {cached_failure}")
+        update_status(download_id, {"status": "error", "error": cached_failure})
+        return {"error": cached_failure, "download_id": download_id, "cached": True}
+
+    try:
+        metadata = _single_flight(
+            cache_key,
+            lambda: _fetch_metadata(url, headers, platform, cache_key, download_id)
+        )
+    except MetadataBusy as e:
+        update_status(download_id, {"status": "error", "error": str(e)})
+        return {"error": str(e), "download_id": download_id, "busy": True}
+    except MetadataError as e:
+        update_status(download_id, {"status": "error", "error": str(e)})
+        return {"error": str(e), "download_id": download_id}
+
+    return _metadata_ready(download_id, metadata, url)
+
+
+def _metadata_ready(download_id, metadata, url):
+    update_status(download_id, {"status": "ready"})
+    return {**metadata, "download_id": download_id, "video_url": url}
+
+# --- Batch Metadata ---
+
+# Shared by batch and progressive requests, so bursts cannot fan out unbounded
+_metadata_executor = ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS, thread_name_prefix="yts-metadata")
+
+def iter_batch_metadata(urls, headers=None, timeout=BATCH_TIMEOUT):
+    """
+    Extracts metadata for many URLs in parallel and yields
+    (index, url, result) in completion order, not input order.
+    """
+    futures = {
+        _metadata_executor.submit(extract_metadata, url, headers): (index, url)
+        for index, url in enumerate(urls)
+    }
+    pending = set(futures)
+
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            pending.discard(future)
+            index, url = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[BATCH ❌] {url}: {e}")
+                result = {"error": f"❌ Extraction failed: {e}"}
+            yield index, url, result
+    except FutureTimeout:
+        for future in pending:
+            future.cancel()
+            index, url = futures[future]
+            yield index, url, {"error": "⏱️ Timed out while extracting metadata."}
+
+# --- Progressive Metadata (basic card first, formats later) ---
+
+OEMBED_ENDPOINTS = {
+    "youtube": "https://www.youtube.com/oembed",
+    "tiktok": "https://www.tiktok.com/oembed",
+}
+OEMBED_TIMEOUT = 3  # seconds; the card is only worth it if it is fast
+
+# download_id -> full extract_metadata result, filled in by the background phase
+_progressive_results = TTLCache(ttl_seconds=METADATA_CACHE_TTL, max_entries=METADATA_CACHE_MAX_ENTRIES, name="progressive")
+# download_ids whose background phase has not stored a result yet (this process only)
+_progressive_pending = set()
+_progressive_lock = threading.Lock()
+
+def extract_basic_metadata(url, platform=None):
+    """
+    Title/thumbnail/uploader from the platform's oEmbed endpoint — one small
+    JSON request, no player or format parsing. Returns None if unsupported.
+    """
+    platform = platform or detect_platform(url)
+    endpoint = OEMBED_ENDPOINTS.get(platform)
+    if not endpoint:
+        return None
+    try:
+        res = requests.get(endpoint, params={"url": url, "format": "json"}, timeout=OEMBED_TIMEOUT)
+        res.raise_for_status()
+        data = res.json()
+    except Exception as e:
+        print(f"[OEMBED ⚠️] {platform} basic metadata failed: {e}")
+        return None
+
+    return {
+        "platform": platform,
+        "title": data.get("title") or "Untitled",
+        "thumbnail": data.get("thumbnail_url"),
+        "uploader": data.get("author_name") or platform,
+        "duration": None,
+        "video_url": url,
+    }
+
+def start_progressive_metadata(url, headers=None):
+    """
+    Phase 1: returns a basic card immediately (or the full result on a cache
+    hit). Phase 2 runs the full extraction in the background; poll it with
+    get_progressive_metadata(download_id).
+    """
+    download_id = str(uuid.uuid4())
+    platform = detect_platform(url)
+    cache_key = metadata_cache_key(url, headers, platform)
+
+    cached = _lookup_cached_metadata(cache_key)
+    if cached:
+        result = _metadata_ready(download_id, cached, url)
+        _progressive_results.set(download_id, result)
+        return {**result, "phase": "full", "complete": True}
+
+    cached_failure = get_cached_failure(cache_key)
+    if cached_failure:
+        update_status(download_id, {"status": "error", "error": cached_failure})
+        return {"error": cached_failure, "download_id": download_id, "cached": True}
+
+    update_status(download_id, {"status": "extracting", "progress": 0, "speed": 0})
+    with _progressive_lock:
+        _progressive_pending.add(download_id)
+
+    def store_result(f):
+        result = f.result() if not f.exception() else {"error": f"❌ Extraction failed: {f.exception()}", "download_id": download_id}
+        with _progressive_lock:
+            _progressive_results.set(download_id, result)
+            _progressive_pending.discard(download_id)
+
+    future = _metadata_executor.submit(extract_metadata, url, headers, download_id)
+    future.add_done_callback(store_result)
+
+    basic = extract_basic_metadata(url, platform) or {"platform": platform, "video_url": url}
+    return {**basic, "download_id": download_id, "phase": "basic", "complete": False}
+
+def get_progressive_metadata(download_id):
+    """
+    Returns the full result once ready, a still-extracting marker while this
+    process is working on it, or None for ids it does not know (typos,
+    expired results, or extractions started on another worker).
+    """
+    with _progressive_lock:
+        result = _progressive_results.get(download_id)
+        pending = download_id in _progressive_pending
+    if result is not None:
+        return {**result, "phase": "full", "complete": True}
+    if pending:
+        return {"download_id": download_id, "phase": "basic", "complete": False, "status": "extracting"}
+    return None
+
+
+def _forget_metadata(cache_key, platform, reason):
+    """
+    Records a permanent failure and drops every cached copy of the video's
+    metadata, so /fetch_info stops handing out a video that is gone.
+    """
+    remember_failure(cache_key, platform, reason)
+    _metadata_cache.pop(cache_key)
+    _info_cache.pop(cache_key)
+    store_delete(cache_key)  # other workers would otherwise reload it
+
+def _lookup_cached_metadata(cache_key):
+    if ENABLE_METADATA_CACHE:
+        cached = _metadata_cache.get(cache_key)
+        if cached:
+            print(f"[CACHE ✅] Metadata hit for {cache_key}")
+            return cached
+
+    stored = store_get(cache_key)
+    if stored:
+        print(f"[STORE ✅] Persistent metadata hit for {cache_key}")
+        if ENABLE_METADATA_CACHE:
+            _metadata_cache.set(cache_key, stored)
+        return stored
+    return None
+
+
+def _fetch_metadata(url, headers, platform, cache_key, download_id=None):
+    if is_short_link(url):
+        url = resolve_redirect_url(url)  # cached; spares yt-dlp a full page fetch
     print(f"[EXTRACT] Extracting from {platform.upper()}: {url}")
 
     merged_headers = merge_headers_with_cookie(headers or {}, platform)
-    cookie_file = _prepare_cookie_file(headers, platform)
+    cookie_file = _prepare_cookie_file(headers, platform, download_id)
 
     ydl_opts = {
         'quiet': True,
@@ -187,7 +884,7 @@ def extract_metadata(url, headers=None, download_id=None):
         'noplaylist': True,
         'extract_flat': False,
         'http_headers': merged_headers,
-        'progress_hooks': [lambda _: cancel_event.is_set() and (_ for _ in ()).throw(Exception("Cancelled"))],
+        **extraction_opts(platform, 'formats'),
     }
 
     if cookie_file:
@@ -196,23 +893,31 @@ def extract_metadata(url, headers=None, download_id=None):
         ydl_opts['proxy'] = GLOBAL_PROXY
 
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with pooled_ydl(ydl_opts, platform) as ydl:
             info = ydl.extract_info(url, download=False)
+            _remember_info(cache_key, ydl.sanitize_info(info))
+    except PoolExhausted as e:
+        # Saturated: the browser fallback is the most expensive path there is
+        print(f"[YDL POOL ⏳] {e}; asking the client to retry")
+        raise MetadataBusy("⏳ Server busy, please retry shortly.") from e
     except Exception as e:
         print(f"[YTDLP ❌] {e}")
-        print(f"[FALLBACK] Trying TikTok extraction with Selenium...")
+        permanent, reason = classify_failure(e)
+        if permanent:
+            # Private/deleted/geo-blocked: a browser fallback won't help either
+            _forget_metadata(cache_key, platform, reason)
+            raise MetadataError(reason)
 
         if platform == "tiktok":
+            print(f"[FALLBACK] Trying TikTok extraction with Selenium...")
             try:
                 info = extract_info_with_selenium(url, headers=headers)
                 print(f"[SELENIUM ✅] Extracted TikTok metadata via browser!")
             except Exception as se:
                 print(f"[FALLBACK ❌] Selenium also failed: {se}")
-                update_status(download_id, {"status": "error", "error": str(se)})
-                return {"error": str(se), "download_id": download_id}
+                raise MetadataError(str(se))
         else:
-            update_status(download_id, {"status": "error", "error": str(e)})
-            return {"error": str(e), "download_id": download_id}
+            raise MetadataError(str(e))
     try:
         formats = info.get("formats", [])
         duration = info.get("duration", 0)
@@ -277,10 +982,7 @@ def extract_metadata(url, headers=None, download_id=None):
             resolutions.append(label)
             sizes.append(size_str)
 
-        update_status(download_id, {"status": "ready"})
-
-        return {
-            "download_id": download_id,
+        metadata = {
             "platform": platform,
             "title": info.get("title", "Untitled"),
             "thumbnail": info.get("thumbnail"),
@@ -295,13 +997,18 @@ def extract_metadata(url, headers=None, download_id=None):
 
     except Exception as e:
         print(f"[FORMAT PARSE ERROR] {e}")
-        update_status(download_id, {"status": "error", "error": "❌ Failed to parse formats."})
-        return {"error": "❌ Failed to parse formats.", "download_id": download_id}
+        raise MetadataError("❌ Failed to parse formats.")
+
+    if ENABLE_METADATA_CACHE:
+        _metadata_cache.set(cache_key, metadata)
+    store_set(cache_key, metadata)
+    return metadata
 
 
 # --- Video Download ---
 
-def start_download(url, resolution, bandwidth_limit=None, headers=None, audio_lang=None):
+def start_download(url, resolution, bandwidth_limit=None, headers=None, audio_lang=None,
+                   priority=PRIORITY_NORMAL):
     def parse_bandwidth_limit(limit):
         if not limit:
             return None
@@ -329,39 +1036,48 @@ def start_download(url, resolution, bandwidth_limit=None, headers=None, audio_la
     filename = generate_filename()
     output_path = os.path.join(VIDEO_DIR, f"{filename}.mp4")
     platform = detect_platform(url)
-    cancel_event = threading.Event()
-    _download_locks[download_id] = cancel_event
+
+    height = resolution.replace("p", "")
+    base_video = f"bestvideo[ext=mp4][height={height}]"
+    base_audio = f"bestaudio[ext=m4a]"
+    if audio_lang:
+        base_audio += f"[language^{audio_lang}]"
+    format_selector = f"{base_video}+{base_audio}/best[ext=mp4][height={height}]"
+
+    video_id = _media_identity(url, platform)
+    stored_key = media_key(platform, video_id, format_selector, "video")
+    if _serve_existing_media(download_id, stored_key, "video_url", "videos"):
+        return download_id
+
+    job, started = _join_or_start(f"{platform}:{video_id or url}|{format_selector}|video", download_id)
+    if not started:
+        return download_id
+    job.live = LiveFile(output_path)
 
     def run():
-        update_status(download_id, {
+        job.publish({
             "status": "starting",
             "progress": 0,
-            "speed": "0KB/s",
+            "speed": 0,
             "video_url": None
         })
 
+        cache_key = None
         try:
-            height = resolution.replace("p", "")
             merged_headers = merge_headers_with_cookie(headers or {}, platform)
-            cookie_file = _prepare_cookie_file(headers, platform)
-
-            base_video = f"bestvideo[ext=mp4][height={height}]"
-            base_audio = f"bestaudio[ext=m4a]"
-            if audio_lang:
-                base_audio += f"[language^{audio_lang}]"
+            cookie_file = _prepare_cookie_file(headers, platform, job.owner_id)
 
             ydl_opts = {
-                'format': f"{base_video}+{base_audio}/best[ext=mp4][height={height}]",
+                'format': format_selector,
                 'outtmpl': output_path,
                 'quiet': True,
                 'noplaylist': True,
                 'merge_output_format': 'mp4',
                 'http_headers': merged_headers,
-                'progress_hooks': [lambda d: _progress_hook(d, download_id, cancel_event)],
-                'postprocessors': [{
-                    'key': 'FFmpegVideoConvertor',
-                    'preferedformat': 'mp4'
-                }],
+                'progress_hooks': [lambda d: _progress_hook(d, job)],
+                'postprocessor_hooks': [lambda d: _postprocess_hook(d, job)],
+                **extraction_opts(platform, 'download'),
+                # ffmpeg steps are chosen per format by _video_direct
             }
 
             if cookie_file:
@@ -374,15 +1090,25 @@ def start_download(url, resolution, bandwidth_limit=None, headers=None, audio_la
             if GLOBAL_PROXY:
                 ydl_opts['proxy'] = GLOBAL_PROXY
 
+            cache_key, info = _reusable_info(url, headers, platform)
+
             start_time = time.time()
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                print(f"[YTDLP] Starting download for {url}")
-                ydl.download([url])
+            with fragment_budget.reserve(platform) as fragments, \
+                    bandwidth_governor.lease(job.owner_id, platform, priority, parsed_limit) as job.lease:
+                ydl_opts['concurrent_fragment_downloads'] = fragments
+                job.publish({"fragment_concurrency": fragments})
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    print(f"[YTDLP] Starting download for {url} (fragments: {fragments})")
+                    direct = _video_direct(output_path, job, platform in SEGMENTED_PLATFORMS)
+                    _run_ydl_download(ydl, url, cache_key, info, direct)
             elapsed = time.time() - start_time
-            print(f"[YTDLP] Download finished in {round(elapsed, 2)}s")
+            if job.postprocess:
+                job.pp_seconds["download"] = round(elapsed - sum(job.pp_seconds.values()), 2)
+                job.publish({"postprocess": _postprocess_report(job)})
+            print(f"[YTDLP] Download finished in {round(elapsed, 2)}s {job.pp_seconds}")
 
-            if cancel_event.is_set():
-                update_status(download_id, {"status": "cancelled"})
+            if job.cancel_event.is_set():
+                job.publish({"status": "cancelled"})
                 return
 
             for i in range(20):
@@ -394,12 +1120,15 @@ def start_download(url, resolution, bandwidth_limit=None, headers=None, audio_la
             if not os.path.exists(output_path):
                 raise FileNotFoundError("Download succeeded but file not found.")
 
-            update_status(download_id, {
+            job.publish({
                 "status": "completed",
                 "progress": 100,
-                "speed": "0KB/s",
+                "speed": 0,
+                "downloaded": os.path.getsize(output_path),
+                "total": os.path.getsize(output_path),
                 "video_url": f"{SERVER_URL}/videos/{os.path.basename(output_path)}"
             })
+            register_media(stored_key, platform, video_id, format_selector, "video", output_path)
 
             save_to_history({
                 "id": download_id,
@@ -409,7 +1138,13 @@ def start_download(url, resolution, bandwidth_limit=None, headers=None, audio_la
                 "size": round(os.path.getsize(output_path) / 1024 / 1024, 2)
             })
 
+        except DownloadPaused:
+            raise  # parked by the shared-job wrapper
+
         except yt_dlp.utils.DownloadError as e:
+            permanent, reason = classify_failure(e)
+            if permanent and cache_key:
+                _forget_metadata(cache_key, platform, reason)  # cached metadata outlived the video
             msg = str(e).lower()
             error_msg = (
                 "🔐 Login or CAPTCHA required." if "sign in" in msg or "captcha" in msg else
@@ -417,53 +1152,133 @@ def start_download(url, resolution, bandwidth_limit=None, headers=None, audio_la
                 "❌ Download failed."
             )
             print(f"[YT-DLP ERROR] {e}")
-            update_status(download_id, {"status": "error", "error": error_msg})
+            job.publish({"status": "error", "error": error_msg})
 
         except Exception as e:
             print(f"[UNEXPECTED ERROR] {e}")
             traceback.print_exc()
-            update_status(download_id, {"status": "error", "error": "❌ Unexpected error."})
+            job.publish({"status": "error", "error": "❌ Unexpected error."})
+
 
-    thread = threading.Thread(target=run, daemon=True)
-    _download_threads[download_id] = thread
-    thread.start()
+    _submit_shared_job(job, platform, run, priority)
     return download_id
 
 
 # --- Progress Hook & Controls ---
 
-def _progress_hook(d, download_id, cancel_event):
-    if cancel_event.is_set():
+def _progress_hook(d, job):
+    if job.cancel_event.is_set():
         raise Exception("Cancelled by user")
+    if job.pause_event.is_set():
+        raise DownloadPaused("Paused by user")  # yt-dlp keeps its .part files
 
     if d.get("status") != "downloading":
         return
 
-    total = d.get("total_bytes") or d.get("total_bytes_estimate") or 1
     downloaded = d.get("downloaded_bytes", 0)
-    percent = int((downloaded / total) * 100)
-    speed = d.get("speed", 0)
-    speed_str = f"{round(speed / 1024, 1)}KB/s" if speed else "0KB/s"
-
-    update_status(download_id, {
+    if job.lease:
+        job.lease.account(downloaded, d.get("filename"))  # sleeps here when over its bandwidth share
+    _publish_progress(job, downloaded, d.get("total_bytes") or d.get("total_bytes_estimate"), d.get("speed"))
+
+def _postprocess_hook(d, job):
+    # Times every ffmpeg step (merge, remux, convert, fixups) of the job
+    name = d.get("postprocessor")
+    if d.get("status") == "started":
+        job.pp_started[name] = time.time()
+        job.publish({"phase": "merge" if name == "Merger" else "postprocess"})
+    elif d.get("status") == "finished":
+        started = job.pp_started.pop(name, None)
+        if started:
+            job.pp_seconds[name] = round(job.pp_seconds.get(name, 0) + time.time() - started, 2)
+
+def _postprocess_report(job):
+    return {**job.postprocess, "seconds": dict(job.pp_seconds)}
+
+def _publish_progress(job, downloaded, total, speed):
+    percent = int((downloaded / (total or 1)) * 100)
+
+    job.publish({
         "status": "downloading",
         "progress": percent,
-        "speed": speed_str
+        "speed": speed or 0,
+        "downloaded": downloaded,
+        "total": total or 0
     })
 
 def cancel_download(download_id):
-    cancel_event = _download_locks.get(download_id)
-    if cancel_event:
-        cancel_event.set()
+    abandoned = False
+    with _shared_lock:
+        job = _subscriptions.pop(download_id, None)
+        if job:
+            job.subscribers = job.subscribers - {download_id}
+            abandoned = not job.subscribers
+            if abandoned and _shared_jobs.get(job.join_key) is job:
+                del _shared_jobs[job.join_key]
+
+    if job:
+        with job.status_lock:  # no publish already in flight can follow it
+            update_status(download_id, {"status": "cancelled"})
+        job_registry.finish(download_id)
+        if abandoned:
+            job.cancel_event.set()
+            download_scheduler.cancel(job.owner_id)
+        else:
+            print(f"[SHARED DL] {download_id} left {job.owner_id}; {len(job.subscribers)} subscriber(s) remain")
+        return True
+
+    entry = job_registry.get(download_id)
+    if entry and entry.finished_at is None:
+        entry.cancel_event.set()
+        download_scheduler.cancel(download_id)
         update_status(download_id, {"status": "cancelled"})
+        job_registry.finish(download_id)
         return True
     return False
 
 def pause_download(download_id):
-    return False
+    """
+    Pauses a queued or running download, keeping partial data on disk. A
+    shared job pauses once all of its subscribers have asked to.
+    """
+    with _shared_lock:
+        job = _subscriptions.get(download_id)
+        if not job or job.paused:
+            return bool(job)
+        job.paused_by.add(download_id)
+        if not job.subscribers <= job.paused_by:
+            return True
+        job.pause_event.set()
+        parked = download_scheduler.cancel(job.owner_id)  # not started yet: just dequeue it
+        job.paused = parked
+
+    if parked:
+        job.publish({"status": "paused", "speed": 0})
+    print(f"[PAUSE] ⏸️ Pause requested for {job.owner_id}")
+    return True
 
 def resume_download(download_id):
-    return False
+    """
+    Re-queues a paused download. yt-dlp continues from its .part files and
+    the cached info_dict is reused unless its signed URLs have expired.
+    """
+    with _shared_lock:
+        job = _subscriptions.get(download_id)
+        if not job:
+            return False
+        job.paused_by.clear()
+        job.pause_event.clear()
+        if not job.paused:
+            return True  # still running; a stopping worker re-queues itself
+        job.paused = False
+
+    _requeue(job)
+    return True
+
+def get_live_file(download_id):
+    """LiveFile of a running video download, or None."""
+    with _shared_lock:
+        job = _subscriptions.get(download_id)
+    return job.live if job else None
 
 def get_video_info(url, headers=None, download_id=None):
     return extract_metadata(url, headers=headers, download_id=download_id)
@@ -495,7 +1310,7 @@ def search_youtube(query, limit=20):
         if cookie_path:
             ydl_opts['cookiefile'] = cookie_path
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with pooled_ydl(ydl_opts, "youtube") as ydl:
             search_result = ydl.extract_info(search_query, download=False)
 
         entries = search_result.get("entries", [])
@@ -508,13 +1323,14 @@ def search_youtube(query, limit=20):
             # Fallback if info is missing
             if not entry.get("thumbnail") or not entry.get("duration"):
                 try:
-                    with yt_dlp.YoutubeDL({
+                    with pooled_ydl({
                         'quiet': True,
                         'skip_download': True,
                         'forcejson': True,
                         'nocheckcertificate': True,
-                        'cookiefile': cookie_path
-                    }) as detail_ydl:
+                        'cookiefile': cookie_path,
+                        **extraction_opts("youtube", 'card'),
+                    }, "youtube") as detail_ydl:
                         entry = detail_ydl.extract_info(video_url, download=False)
                 except Exception as detail_error:
                     print(f"[YT-FALLBACK ❌] Failed full info for {video_url}: {detail_error}")
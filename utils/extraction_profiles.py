@@ -0,0 +1,59 @@
+# 📁 utils/extraction_profiles.py
+#
+# Named yt-dlp option sets, so each call only makes the requests it needs:
+#   card     → title / thumbnail / duration (no formats)
+#   formats  → everything /fetch_info shows (mp4 video + m4a audio, dubs)
+#   download → whatever the download pipeline may select
+
+# Never used by the server on any platform
+LEAN_COMMON_OPTS = {
+    'writesubtitles': False,
+    'writeautomaticsub': False,
+    'getcomments': False,
+    'writethumbnail': False,
+    'writeinfojson': False,
+}
+
+EXTRACTION_PROFILES = {
+    'youtube': {
+        'card': {
+            'check_formats': False,
+            'extractor_args': {'youtube': {
+                'player_client': ['web'],
+                'player_skip': ['configs', 'js'],  # no player JS: signatures aren't needed for a card
+                'skip': ['hls', 'dash', 'translated_subs'],
+            }},
+        },
+        'formats': {
+            'check_formats': False,
+            'extractor_args': {'youtube': {
+                'player_skip': ['configs'],
+                'skip': ['hls', 'translated_subs'],  # only DASH mp4/m4a are offered to clients
+            }},
+        },
+        'download': {
+            'extractor_args': {'youtube': {
+                'skip': ['translated_subs'],
+            }},
+        },
+    },
+    # No extractor args worth setting yet; these only get the common options.
+    'tiktok': {'card': {'check_formats': False}, 'formats': {'check_formats': False}, 'download': {}},
+    'facebook': {'card': {'check_formats': False}, 'formats': {'check_formats': False}, 'download': {}},
+    'instagram': {'card': {'check_formats': False}, 'formats': {'check_formats': False}, 'download': {}},
+}
+
+PROFILE_NAMES = ('card', 'formats', 'download')
+
+
+def extraction_opts(platform: str, profile: str) -> dict:
+    """
+    Returns yt-dlp options for a platform/profile, to merge into ydl_opts.
+    Unknown platforms get only the common options.
+    """
+    if profile not in PROFILE_NAMES:
+        raise ValueError(f"Unknown extraction profile: {profile}")
+
+    opts = dict(LEAN_COMMON_OPTS)
+    opts.update(EXTRACTION_PROFILES.get(platform, {}).get(profile, {}))
+    return opts
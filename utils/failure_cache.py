@@ -0,0 +1,74 @@
+from config import NEGATIVE_CACHE_TTL, NEGATIVE_CACHE_MAX_ENTRIES
+from utils.cache import TTLCache
+
+# (substring in lowercased error, client-facing reason). First match wins.
+PERMANENT_FAILURES = [
+    ("private video", "🔒 This video is private."),
+    ("this video is private", "🔒 This video is private."),
+    ("this post is private", "🔒 This post is private."),
+    ("members-only", "🔒 This video is for channel members only."),
+    ("join this channel", "🔒 This video is for channel members only."),
+    ("not available in your country", "🌍 This video is not available in this region."),
+    ("blocked it in your country", "🌍 This video is not available in this region."),
+    ("geo restrict", "🌍 This video is not available in this region."),
+    ("geo-restrict", "🌍 This video is not available in this region."),
+    ("copyright", "❌ This video was removed for copyright reasons."),
+    ("has been removed", "❌ This video has been removed."),
+    ("has been terminated", "❌ The account behind this video was terminated."),
+    ("video unavailable", "❌ Video unavailable."),
+    ("video is unavailable", "❌ Video unavailable."),
+    ("does not exist", "❌ Video not found."),
+    ("http error 404", "❌ Video not found."),
+    ("unsupported url", "❌ Unsupported or invalid video link."),
+    ("is not a valid url", "❌ Unsupported or invalid video link."),
+]
+
+# Checked first: these look permanent but clear up on retry or cookie refresh.
+TRANSIENT_MARKERS = (
+    "timed out", "timeout", "429", "too many requests", "temporarily",
+    "try again later", "connection", "http error 5", "not a bot", "rate-limit",
+)
+
+_failure_cache = TTLCache(
+    ttl_seconds=NEGATIVE_CACHE_TTL["unknown"],
+    max_entries=NEGATIVE_CACHE_MAX_ENTRIES,
+    name="failures",
+)
+
+
+class PermanentFailure(Exception):
+    """Extraction failed in a way retries will not fix (private, deleted...)."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def classify_failure(error) -> tuple[bool, str]:
+    """
+    Returns (is_permanent, reason). Unknown errors count as transient, so a
+    misclassification only costs a retry, never a wrongly blocked link.
+    """
+    msg = str(error).lower()
+    if any(marker in msg for marker in TRANSIENT_MARKERS):
+        return False, str(error)
+    for needle, reason in PERMANENT_FAILURES:
+        if needle in msg:
+            return True, reason
+    return False, str(error)
+
+
+def remember_failure(key: str, platform: str, reason: str):
+    ttl = NEGATIVE_CACHE_TTL.get(platform, NEGATIVE_CACHE_TTL["unknown"])
+    print(f"[NEGATIVE CACHE] 🚫 {key} for {ttl}s: {reason}")
+    _failure_cache.set(key, reason, ttl_seconds=ttl)
+
+
+def get_cached_failure(key: str) -> str | None:
+    return _failure_cache.get(key)
+
+
+def get_failure_cache_stats() -> dict:
+    stats = _failure_cache.stats()
+    stats["ttl_by_platform"] = NEGATIVE_CACHE_TTL
+    return stats
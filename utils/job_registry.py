@@ -0,0 +1,148 @@
+# 📁 utils/job_registry.py
+#
+# One entry per download_id for as long as the server needs to know about it:
+# the cancel event, the worker thread while it runs, the status record and any
+# temp files (header cookie files). Finished jobs stay for JOB_RETENTION so
+# clients can still read their final status; the reaper then evicts them,
+# clearing the status and deleting temp files no other job still uses.
+
+import os
+import threading
+import time
+
+from config import JOB_RETENTION, JOB_REGISTRY_MAX, JOB_REAP_INTERVAL, STATUS_STALE_TIMEOUT
+from utils.status_manager import clear_status, cleanup_stale_statuses
+
+
+class JobEntry:
+    __slots__ = ("download_id", "kind", "cancel_event", "thread", "temp_files", "created_at", "finished_at")
+
+    def __init__(self, download_id, kind, cancel_event):
+        self.download_id = download_id
+        self.kind = kind  # download / metadata
+        self.cancel_event = cancel_event or threading.Event()
+        self.thread = None  # worker thread, only while running
+        self.temp_files = ()
+        self.created_at = time.time()
+        self.finished_at = None
+
+
+class JobRegistry:
+    def __init__(self, retention=JOB_RETENTION, max_jobs=JOB_REGISTRY_MAX):
+        self.retention = retention
+        self.max_jobs = max_jobs
+        self._entries = {}  # download_id -> JobEntry, in registration order
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def register(self, download_id, kind="download", cancel_event=None) -> JobEntry:
+        with self._lock:
+            entry = self._entries.get(download_id)
+            if entry is None:
+                entry = self._entries[download_id] = JobEntry(download_id, kind, cancel_event)
+            overflow = len(self._entries) > self.max_jobs
+        if overflow:
+            self.reap(force=True)
+        return entry
+
+    def get(self, download_id) -> JobEntry | None:
+        with self._lock:
+            return self._entries.get(download_id)
+
+    def cancel_event(self, download_id):
+        entry = self.get(download_id)
+        return entry.cancel_event if entry else None
+
+    def add_temp_file(self, download_id, path):
+        with self._lock:
+            entry = self._entries.get(download_id)
+            if entry and path not in entry.temp_files:
+                entry.temp_files += (path,)
+
+    def bind_thread(self, download_id, thread=None):
+        """Records the worker running the job; None once it has let go."""
+        with self._lock:
+            entry = self._entries.get(download_id)
+            if entry:
+                entry.thread = thread
+
+    def finish(self, download_id):
+        """The job reached a terminal state; it is evicted after the retention window."""
+        with self._lock:
+            entry = self._entries.get(download_id)
+            if entry and entry.finished_at is None:
+                entry.finished_at = time.time()
+                entry.thread = None
+
+    def discard(self, download_id):
+        """Forgets a job that never started (e.g. rejected by a full queue)."""
+        with self._lock:
+            self._entries.pop(download_id, None)
+
+    def is_active(self, download_id) -> bool:
+        entry = self.get(download_id)
+        return entry is not None and entry.finished_at is None
+
+    def reap(self, force=False) -> int:
+        """
+        Evicts finished jobs older than the retention window. With force,
+        also evicts the oldest finished jobs until the registry is back
+        under max_jobs. Running and paused jobs are never evicted.
+        """
+        cutoff = time.time() - self.retention
+        with self._lock:
+            finished = [e for e in self._entries.values() if e.finished_at is not None]
+            victims = [e for e in finished if e.finished_at < cutoff]
+            excess = len(self._entries) - len(victims) - self.max_jobs
+            if force and excess > 0:
+                chosen = {id(e) for e in victims}
+                extra = sorted((e for e in finished if id(e) not in chosen), key=lambda e: e.finished_at)
+                victims += extra[:excess]
+            for entry in victims:
+                del self._entries[entry.download_id]
+            in_use = {path for e in self._entries.values() for path in e.temp_files}
+            self.evicted += len(victims)
+            # Removed under the lock: a job claiming the same file afterwards
+            # finds it gone and writes it again
+            for path in {path for e in victims for path in e.temp_files} - in_use:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"[JOBS] ⚠️ Could not remove temp file {path}: {e}")
+
+        for entry in victims:
+            clear_status(entry.download_id)
+        return len(victims)
+
+    def stats(self) -> dict:
+        with self._lock:
+            running = sum(1 for e in self._entries.values() if e.thread is not None)
+            finished = sum(1 for e in self._entries.values() if e.finished_at is not None)
+            return {
+                "size": len(self._entries),
+                "max": self.max_jobs,
+                "running": running,
+                "finished": finished,
+                "pending": len(self._entries) - finished,
+                "evicted": self.evicted,
+                "retention_seconds": self.retention,
+            }
+
+
+job_registry = JobRegistry()
+
+
+def run_reaper():
+    print(f"[JOBS] 🔁 Reaper started (retention {JOB_RETENTION}s, every {JOB_REAP_INTERVAL}s)")
+    while True:
+        try:
+            evicted = job_registry.reap()
+            # Statuses written outside the registry (services/*) age out here
+            stale = cleanup_stale_statuses(STATUS_STALE_TIMEOUT, keep=job_registry.is_active)
+            if evicted or stale:
+                print(f"[JOBS] 🧹 Evicted {evicted} finished job(s), {stale} stale status(es)")
+        except Exception as e:
+            print(f"[JOBS ERROR] ❌ Reaper failed: {e}")
+        time.sleep(JOB_REAP_INTERVAL)
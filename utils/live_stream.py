@@ -0,0 +1,112 @@
+# 📁 utils/live_stream.py
+#
+# Lets /stream/<download_id> send a file while it is still being downloaded.
+# The writer marks the file as started once it knows the download is a single
+# file (no merge); readers tail it up to the "safe" byte count and wait when
+# they catch up with the writer.
+
+import os
+import threading
+import time
+
+from config import STREAM_IDLE_TIMEOUT
+
+CHUNK_SIZE = 256 * 1024
+FOLLOW_INTERVAL = 0.25  # seconds a caught-up reader waits before checking again
+
+PENDING = "pending"          # format not chosen yet
+WRITING = "writing"
+DONE = "done"
+FAILED = "failed"
+UNSUPPORTED = "unsupported"  # merged / converted output, only servable when finished
+
+
+class LiveFile:
+    """
+    A download target that readers may follow while it grows. The writer
+    goes to final_path + ".part" and renames it when finished.
+    """
+
+    def __init__(self, final_path):
+        self.final_path = final_path
+        self.part_path = final_path + ".part"
+        self.state = PENDING
+        self.size = None  # exact total, when the writer knows it
+        self._watermark = None
+        self._cond = threading.Condition()
+
+    def _set_state(self, state):
+        with self._cond:
+            self.state = state
+            self._cond.notify_all()
+
+    def start(self, size=None, watermark=None):
+        """
+        watermark() returns how many leading bytes are safe to read; without
+        it the current file size is used (sequential writers).
+        """
+        self.size = size
+        self._watermark = watermark
+        self._set_state(WRITING)
+
+    def finish(self, ok=True):
+        if self.state in (PENDING, WRITING):
+            self._set_state(DONE if ok else FAILED)
+
+    def unsupported(self):
+        self._set_state(UNSUPPORTED)
+
+    def wait_started(self, timeout) -> str:
+        with self._cond:
+            self._cond.wait_for(lambda: self.state != PENDING, timeout)
+            return self.state
+
+    def wait(self, timeout=FOLLOW_INTERVAL):
+        with self._cond:
+            self._cond.wait(timeout)
+
+    def open(self):
+        paths = (self.final_path, self.part_path) if self.state == DONE else (self.part_path, self.final_path)
+        for path in paths:
+            try:
+                return open(path, "rb")  # stays valid across the .part rename
+            except FileNotFoundError:
+                continue
+        return None
+
+    def readable(self, f) -> int:
+        if self._watermark and self.state != DONE:
+            return self._watermark()
+        return os.fstat(f.fileno()).st_size
+
+
+def follow(live, chunk_size=CHUNK_SIZE, idle_timeout=STREAM_IDLE_TIMEOUT):
+    """Yields the file's bytes as they land on disk, until the writer is done."""
+    f = None
+    sent = 0
+    last_data = time.monotonic()
+    try:
+        while True:
+            state = live.state  # read before the size, so DONE means the size is final
+            if f is None:
+                f = live.open()
+            if f is not None:
+                limit = live.readable(f)
+                if sent < limit:
+                    data = os.pread(f.fileno(), min(chunk_size, limit - sent), sent)
+                    if data:
+                        sent += len(data)
+                        last_data = time.monotonic()
+                        yield data
+                        continue
+                if state == DONE:
+                    return
+            if state in (FAILED, UNSUPPORTED) or (state == DONE and f is None):
+                return
+            if time.monotonic() - last_data > idle_timeout:
+                print(f"[STREAM] ⏱️ Writer idle for {idle_timeout}s, closing stream of {os.path.basename(live.final_path)}")
+                return
+            live.wait()
+    finally:
+        if f is not None:
+            f.close()
@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+import time
+
+from config import MEDIA_INDEX_PATH, MEDIA_DISK_BUDGET, ENABLE_MEDIA_DEDUP
+
+# Completed files indexed by (platform, video id, format selector, type), so a
+# repeat request is served from disk. One connection per thread, WAL mode so
+# every gunicorn worker shares the index.
+_local = threading.local()
+_evict_lock = threading.Lock()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    key TEXT PRIMARY KEY,
+    platform TEXT NOT NULL,
+    video_id TEXT NOT NULL,
+    format TEXT NOT NULL,
+    media_type TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_media_last_access ON media(last_access);
+CREATE INDEX IF NOT EXISTS idx_media_path ON media(path);
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(MEDIA_INDEX_PATH), exist_ok=True)
+        conn = sqlite3.connect(MEDIA_INDEX_PATH, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def media_key(platform: str, video_id: str, format_selector: str, media_type: str) -> str | None:
+    if not ENABLE_MEDIA_DEDUP or not video_id:
+        return None
+    return f"{platform}:{video_id}|{format_selector}|{media_type}"
+
+
+def lookup_media(key: str) -> dict | None:
+    """
+    Returns {"path", "size"} for a completed file and marks it recently used.
+    Rows whose file has vanished are dropped.
+    """
+    if not key:
+        return None
+    try:
+        conn = _connect()
+        row = conn.execute("SELECT path, size FROM media WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        path, size = row
+        if not os.path.isfile(path):
+            conn.execute("DELETE FROM media WHERE key = ?", (key,))
+            return None
+        conn.execute("UPDATE media SET last_access = ? WHERE key = ?", (time.time(), key))
+        return {"path": path, "size": size}
+    except Exception as e:
+        print(f"[MEDIA STORE] ⚠️ Lookup failed for {key}: {e}")
+        return None
+
+
+def register_media(key: str, platform: str, video_id: str, format_selector: str, media_type: str, path: str):
+    if not key or not os.path.isfile(path):
+        return
+    now = time.time()
+    try:
+        _connect().execute(
+            "INSERT OR REPLACE INTO media "
+            "(key, platform, video_id, format, media_type, path, size, created_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, platform, video_id, format_selector, media_type, os.path.abspath(path),
+             os.path.getsize(path), now, now)
+        )
+        print(f"[MEDIA STORE] 📦 Indexed {os.path.basename(path)} as {key}")
+    except Exception as e:
+        print(f"[MEDIA STORE] ⚠️ Register failed for {key}: {e}")
+        return
+    enforce_disk_budget()
+
+
+def indexed_paths() -> set:
+    try:
+        return {row[0] for row in _connect().execute("SELECT path FROM media")}
+    except Exception as e:
+        print(f"[MEDIA STORE] ⚠️ Could not list index: {e}")
+        return set()
+
+
+def enforce_disk_budget(budget: int = MEDIA_DISK_BUDGET) -> int:
+    """
+    Deletes least-recently-used files until indexed media fits the budget.
+    Returns the number of bytes freed.
+    """
+    freed = 0
+    with _evict_lock:
+        try:
+            conn = _connect()
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM media").fetchone()[0]
+            if total <= budget:
+                return 0
+
+            for key, path, size in conn.execute(
+                "SELECT key, path, size FROM media ORDER BY last_access ASC"
+            ).fetchall():
+                if total <= budget:
+                    break
+                try:
+                    if os.path.isfile(path):
+                        os.remove(path)
+                except Exception as e:
+                    print(f"[MEDIA STORE] ⚠️ Could not delete {path}: {e}")
+                    continue
+                conn.execute("DELETE FROM media WHERE key = ?", (key,))
+                total -= size
+                freed += size
+                print(f"[MEDIA STORE] 🗑️ Evicted {os.path.basename(path)} ({round(size / 1024 / 1024, 2)} MB)")
+        except Exception as e:
+            print(f"[MEDIA STORE ERROR] ❌ Budget enforcement failed: {e}")
+    return freed
+
+
+def media_stats() -> dict:
+    try:
+        count, total = _connect().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM media").fetchone()
+        return {"enabled": ENABLE_MEDIA_DEDUP, "files": count, "bytes": total, "budget_bytes": MEDIA_DISK_BUDGET}
+    except Exception as e:
+        return {"enabled": ENABLE_MEDIA_DEDUP, "error": str(e)}
@@ -0,0 +1,107 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+
+from config import (
+    ENABLE_METADATA_STORE,
+    METADATA_STORE_PATH,
+    METADATA_STORE_TTL,
+    METADATA_STORE_COMPACT_INTERVAL,
+)
+
+# One connection per thread; WAL lets every gunicorn worker read while one writes.
+_local = threading.local()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_metadata_expires ON metadata(expires_at);
+"""
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        os.makedirs(os.path.dirname(METADATA_STORE_PATH), exist_ok=True)
+        conn = sqlite3.connect(METADATA_STORE_PATH, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def store_get(key: str) -> dict | None:
+    if not ENABLE_METADATA_STORE:
+        return None
+    try:
+        row = _connect().execute(
+            "SELECT value FROM metadata WHERE key = ? AND expires_at > ?",
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    except Exception as e:
+        print(f"[METADATA STORE] ⚠️ Read failed for {key}: {e}")
+        return None
+
+
+def store_set(key: str, value: dict, ttl_seconds: int = None):
+    if not ENABLE_METADATA_STORE:
+        return
+    now = time.time()
+    ttl = METADATA_STORE_TTL if ttl_seconds is None else ttl_seconds
+    try:
+        _connect().execute(
+            "INSERT OR REPLACE INTO metadata (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + ttl, now)
+        )
+    except Exception as e:
+        print(f"[METADATA STORE] ⚠️ Write failed for {key}: {e}")
+
+
+def store_delete(key: str):
+    if not ENABLE_METADATA_STORE:
+        return
+    try:
+        _connect().execute("DELETE FROM metadata WHERE key = ?", (key,))
+    except Exception as e:
+        print(f"[METADATA STORE] ⚠️ Delete failed for {key}: {e}")
+
+
+def compact_expired() -> int:
+    """
+    Removes expired rows. Returns the number of rows deleted.
+    """
+    cur = _connect().execute("DELETE FROM metadata WHERE expires_at <= ?", (time.time(),))
+    return cur.rowcount
+
+
+def run_compactor():
+    print(f"[METADATA STORE] 🔁 Compactor started for {METADATA_STORE_PATH}")
+    while True:
+        try:
+            removed = compact_expired()
+            if removed:
+                print(f"[METADATA STORE] 🧹 Removed {removed} expired entries")
+        except Exception as e:
+            print(f"[METADATA STORE ERROR] ❌ Compaction failed: {e}")
+        time.sleep(METADATA_STORE_COMPACT_INTERVAL)
+
+
+def store_stats() -> dict:
+    if not ENABLE_METADATA_STORE:
+        return {"enabled": False}
+    try:
+        total, live = _connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(expires_at > ?), 0) FROM metadata",
+            (time.time(),)
+        ).fetchone()
+        return {"enabled": True, "path": METADATA_STORE_PATH, "entries": total, "live": live}
+    except Exception as e:
+        return {"enabled": True, "path": METADATA_STORE_PATH, "error": str(e)}
@@ -1,5 +1,6 @@
 import os
 import re
+import hashlib
 
 # === PLATFORM DETECTION ===
 
@@ -7,7 +8,8 @@ def detect_platform(url: str) -> str:
     """
     Detects the platform based on known patterns in the URL.
     """
-    url = url.lower().strip()
+    original = url.strip()
+    url = original.lower()
 
     platform_patterns = {
         'youtube': r'(youtube\.com|youtu\.be)',
@@ -22,8 +24,63 @@ def detect_platform(url: str) -> str:
         if re.search(pattern, url):
             return platform
 
+    # A short link resolved earlier may point at a known platform
+    from utils.redirect_resolver import peek_resolved
+    resolved = peek_resolved(original)
+    if resolved and resolved != original:
+        return detect_platform(resolved)
+
     return 'unknown'
 
+# === CANONICAL VIDEO IDS ===
+
+VIDEO_ID_PATTERNS = {
+    'youtube': [
+        r'[?&]v=([A-Za-z0-9_-]{11})',
+        r'youtu\.be/([A-Za-z0-9_-]{11})',
+        r'youtube\.com/(?:shorts|embed|live|v)/([A-Za-z0-9_-]{11})',
+    ],
+    'tiktok': [
+        r'tiktok\.com/.*?/(?:video|photo)/(\d+)',
+        r'tiktok\.com/v/(\d+)',
+    ],
+    'facebook': [
+        r'facebook\.com/.*?/videos/(?:[^/?#]+/)?(\d+)',
+        r'facebook\.com/(?:watch/?\?v=|video\.php\?v=|reel/)(\d+)',
+    ],
+    'instagram': [
+        r'instagram\.com/(?:[^/?#]+/)?(?:p|reel|reels|tv)/([A-Za-z0-9_-]+)',
+    ],
+    'twitter': [
+        r'(?:twitter|x)\.com/[^/?#]+/status/(\d+)',
+    ],
+    'threads': [
+        r'threads\.net/@[^/?#]+/post/([A-Za-z0-9_-]+)',
+    ],
+}
+
+def extract_video_id(url: str, platform: str = None) -> str | None:
+    """
+    Returns the platform's canonical video ID for a URL, or None if unknown.
+    """
+    platform = platform or detect_platform(url)
+    for pattern in VIDEO_ID_PATTERNS.get(platform, []):
+        match = re.search(pattern, url.strip())
+        if match:
+            return match.group(1)
+    return None
+
+def canonical_video_key(url: str, platform: str = None) -> str:
+    """
+    Stable identity for a video: "<platform>:<id>", falling back to the
+    normalised URL when no ID can be parsed (short links, unknown sites).
+    """
+    platform = platform or detect_platform(url)
+    video_id = extract_video_id(url, platform)
+    if video_id:
+        return f"{platform}:{video_id}"
+    return f"{platform}:{url.strip().split('#')[0].rstrip('/')}"
+
 # === COOKIE HANDLING ===
 
 COOKIE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'cookies'))
@@ -54,6 +111,17 @@ def get_cookie_file_for_platform(platform: str) -> str | None:
         print(f"[COOKIES] ❌ Cookie file missing: {path}")
         return None
 
+def cookie_profile(headers: dict, platform: str) -> str:
+    """
+    Identifies which login a request runs under (for cache keys) without
+    exposing the cookie itself.
+    """
+    if headers and 'Cookie' in headers:
+        return "hdr-" + hashlib.sha1(headers['Cookie'].encode('utf-8')).hexdigest()[:12]
+    if get_cookie_file_for_platform(platform):
+        return f"file-{platform}"
+    return "anon"
+
 def merge_headers_with_cookie(headers: dict, platform: str) -> dict:
     """
     Merges headers with cookie content from file (if available and not overridden).
@@ -0,0 +1,95 @@
+# 📁 utils/postprocess_planner.py
+#
+# Decides, per selected format, how much ffmpeg work a download needs:
+#   none      → the file is already an mp4 with mp4-safe codecs
+#   remux     → stream copy into mp4 (merging DASH streams is a remux too)
+#   transcode → re-encode; only when a codec cannot live in an mp4
+# Audio jobs follow the same scheme: the native stream is served as-is or
+# copied out of its container, and MP3 is encoded only on explicit request.
+
+from yt_dlp.postprocessor import FFmpegExtractAudioPP, FFmpegVideoConvertorPP, FFmpegVideoRemuxerPP
+
+# Codec prefixes ffmpeg can stream-copy into an mp4 container
+MP4_VIDEO_CODECS = ("avc1", "avc3", "h264", "hev1", "hvc1", "h265", "hevc", "av01", "vp09", "vp9")
+MP4_AUDIO_CODECS = ("mp4a", "aac", "ac-3", "ac3", "ec-3", "eac3", "mp3", "opus", "flac", "alac")
+# When yt-dlp does not report codecs, trust the container
+MP4_SAFE_EXTS = {"mp4", "m4a", "m4v"}
+# Audio-only files clients can play without any repackaging
+NATIVE_AUDIO_EXTS = {"m4a", "mp3", "aac", "opus", "ogg"}
+
+PATH_NONE = "none"
+PATH_REMUX = "remux"
+PATH_TRANSCODE = "transcode"
+
+
+def _codec_ok(codec, allowed):
+    return codec.lower().startswith(allowed)
+
+
+def _streams_fit_mp4(streams):
+    for f in streams:
+        vcodec, acodec = f.get("vcodec"), f.get("acodec")
+        if not vcodec and not acodec:
+            if f.get("ext") not in MP4_SAFE_EXTS:
+                return False, f"unknown codecs in .{f.get('ext')}"
+            continue
+        if vcodec and vcodec != "none" and not _codec_ok(vcodec, MP4_VIDEO_CODECS):
+            return False, f"video codec {vcodec}"
+        if acodec and acodec != "none" and not _codec_ok(acodec, MP4_AUDIO_CODECS):
+            return False, f"audio codec {acodec}"
+    return True, None
+
+
+def plan_postprocessing(selected: dict, target_ext: str = "mp4") -> dict:
+    """
+    Returns {"path", "reason", "postprocessors"} for a format yt-dlp has
+    already selected. postprocessors are (class, kwargs) pairs to attach
+    after the download (and merge) finish.
+    """
+    streams = selected.get("requested_formats") or [selected]
+    merged = len(streams) > 1
+    container = selected.get("ext") or streams[0].get("ext")
+    fits, problem = _streams_fit_mp4(streams)
+
+    if not fits:
+        return {
+            "path": PATH_TRANSCODE,
+            "reason": f"{problem} cannot be copied into {target_ext}",
+            "postprocessors": [(FFmpegVideoConvertorPP, {"preferedformat": target_ext})],
+        }
+    if merged:
+        # yt-dlp's merger already stream-copies into merge_output_format
+        return {"path": PATH_REMUX, "reason": "merge by stream copy", "postprocessors": []}
+    if container == target_ext:
+        return {"path": PATH_NONE, "reason": f"already {target_ext}", "postprocessors": []}
+    return {
+        "path": PATH_REMUX,
+        "reason": f"{container} → {target_ext} by stream copy",
+        "postprocessors": [(FFmpegVideoRemuxerPP, {"preferedformat": target_ext})],
+    }
+
+
+def plan_audio(selected: dict, want_mp3: bool = False, quality: str = "192") -> dict:
+    """
+    Same shape as plan_postprocessing, for audio downloads. Native mode keeps
+    the source codec; want_mp3 re-encodes unless the source already is MP3.
+    """
+    ext = selected.get("ext")
+    acodec = (selected.get("acodec") or "").lower()
+    audio_only = not selected.get("requested_formats") and selected.get("vcodec") in (None, "none")
+
+    if want_mp3:
+        if audio_only and (ext == "mp3" or acodec.startswith("mp3")):
+            return {"path": PATH_NONE, "reason": "source is already mp3", "postprocessors": []}
+        return {
+            "path": PATH_TRANSCODE,
+            "reason": f"mp3 requested ({acodec or ext} source)",
+            "postprocessors": [(FFmpegExtractAudioPP, {"preferredcodec": "mp3", "preferredquality": quality})],
+        }
+    if audio_only and ext in NATIVE_AUDIO_EXTS:
+        return {"path": PATH_NONE, "reason": f"native {ext} served as-is", "postprocessors": []}
+    return {
+        "path": PATH_REMUX,
+        "reason": f"{acodec or 'audio'} copied out of .{ext}",
+        "postprocessors": [(FFmpegExtractAudioPP, {"preferredcodec": "best"})],
+    }
@@ -0,0 +1,93 @@
+import requests
+from urllib.parse import urljoin, urlparse
+from requests.adapters import HTTPAdapter
+
+from config import REDIRECT_CACHE_TTL, REDIRECT_CACHE_MAX_ENTRIES
+from utils.cache import TTLCache
+from utils.platform_helper import detect_platform, extract_video_id
+
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36'
+    )
+}
+
+# Hosts whose links never carry a video ID and must be resolved first
+SHORT_LINK_HOSTS = {"vt.tiktok.com", "vm.tiktok.com", "fb.watch"}
+MAX_REDIRECT_HOPS = 8
+
+_redirect_cache = TTLCache(
+    ttl_seconds=REDIRECT_CACHE_TTL,
+    max_entries=REDIRECT_CACHE_MAX_ENTRIES,
+    name="redirects",
+)
+
+# Keep-alive connections shared by every resolve call
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32))
+_session.mount("http://", HTTPAdapter(pool_connections=8, pool_maxsize=32))
+
+
+def is_short_link(url: str) -> bool:
+    host = (urlparse(url.strip()).hostname or "").lower()
+    return host in SHORT_LINK_HOSTS or (host.endswith("facebook.com") and "/share/" in url)
+
+
+def _is_canonical(url: str) -> bool:
+    return extract_video_id(url, detect_platform(url)) is not None
+
+
+def _next_hop(url: str, headers: dict) -> str | None:
+    """
+    Returns the Location of one redirect without downloading a body.
+    HEAD first; some CDNs reject HEAD, so fall back to a streamed GET that
+    is closed before the body is read.
+    """
+    res = _session.head(url, allow_redirects=False, timeout=10, headers=headers)
+    if res.status_code in (400, 403, 405, 501):
+        res = _session.get(url, allow_redirects=False, timeout=10, headers=headers, stream=True)
+        res.close()
+
+    location = res.headers.get("Location")
+    if res.is_redirect and location:
+        return urljoin(url, location)
+    return None
+
+
+def resolve_redirect_url(url: str, headers: dict = None) -> str:
+    """
+    Follows redirects with no-body requests and stops at the first URL that
+    carries a canonical video ID. Results are cached; on failure the input
+    URL is returned unchanged (and not cached).
+    """
+    url = url.strip()
+    cached = _redirect_cache.get(url)
+    if cached:
+        return cached
+
+    current = url
+    try:
+        for _ in range(MAX_REDIRECT_HOPS):
+            if _is_canonical(current):
+                break
+            nxt = _next_hop(current, headers or DEFAULT_HEADERS)
+            if not nxt:
+                break
+            current = nxt
+    except Exception as e:
+        print(f"[REDIRECT] ⚠️ Resolve error for {url}: {e}")
+        return url
+
+    print(f"[REDIRECT] 🔗 {url} → {current}")
+    _redirect_cache.set(url, current)
+    return current
+
+
+def peek_resolved(url: str) -> str | None:
+    """Cached resolution for url, without any network access."""
+    return _redirect_cache.get(url.strip())
+
+
+def get_redirect_cache_stats() -> dict:
+    return _redirect_cache.stats()
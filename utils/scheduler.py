@@ -0,0 +1,199 @@
+import bisect
+import itertools
+import threading
+import traceback
+from contextlib import contextmanager
+
+from config import (
+    SCHEDULER_WORKERS,
+    SCHEDULER_MAX_QUEUE,
+    PLATFORM_CONCURRENCY,
+    DEFAULT_PLATFORM_CONCURRENCY,
+    FRAGMENT_CONCURRENCY,
+    DEFAULT_FRAGMENT_CONCURRENCY,
+    FRAGMENT_BUDGET,
+)
+from utils.status_manager import update_status
+
+# Lower runs first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+
+class QueueFull(Exception):
+    """The download queue is at capacity; the caller should retry later."""
+
+
+class DownloadScheduler:
+    """
+    Fixed pool of worker threads pulling download jobs from a priority queue.
+    A job only starts when its platform is below its concurrency cap, so a
+    burst on one platform cannot starve the others.
+    """
+
+    def __init__(self, workers=8, max_queue=200, platform_limits=None, default_limit=2):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.platform_limits = platform_limits or {}
+        self.default_limit = default_limit
+        self._cond = threading.Condition()
+        self._queue = []  # sorted [(priority, seq, job_id, platform, fn)]
+        self._running = {}  # platform -> running count
+        self._seq = itertools.count()
+        self._threads = []
+        self.completed = 0
+        self.rejected = 0
+
+    def _ensure_workers(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"yts-download-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"[SCHEDULER] 🚦 Started {self.workers} download workers")
+
+    def limit_for(self, platform):
+        return self.platform_limits.get(platform, self.default_limit)
+
+    def submit(self, job_id, platform, fn, priority=PRIORITY_NORMAL):
+        """
+        Queues fn() to run on a worker. Raises QueueFull if the queue is full.
+        """
+        with self._cond:
+            self._ensure_workers()
+            if len(self._queue) >= self.max_queue:
+                self.rejected += 1
+                raise QueueFull(f"Download queue is full ({self.max_queue} jobs)")
+
+            bisect.insort(self._queue, (priority, next(self._seq), job_id, platform, fn))
+            update_status(job_id, {"status": "queued", "progress": 0, "speed": 0, "platform": platform})
+            self._cond.notify()
+
+    def cancel(self, job_id) -> bool:
+        """Removes a job that has not started yet. Returns True if removed."""
+        with self._cond:
+            for i, entry in enumerate(self._queue):
+                if entry[2] == job_id:
+                    del self._queue[i]
+                    return True
+        return False
+
+    def position(self, job_id):
+        """1-based queue position, or None if the job is not waiting."""
+        with self._cond:
+            for i, entry in enumerate(self._queue):
+                if entry[2] == job_id:
+                    return i + 1
+        return None
+
+    def _take_runnable(self):
+        for i, entry in enumerate(self._queue):
+            platform = entry[3]
+            if self._running.get(platform, 0) < self.limit_for(platform):
+                del self._queue[i]
+                self._running[platform] = self._running.get(platform, 0) + 1
+                return entry
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                entry = self._take_runnable()
+                while entry is None:
+                    self._cond.wait()
+                    entry = self._take_runnable()
+
+            _, _, job_id, platform, fn = entry
+            try:
+                fn()
+            except Exception as e:
+                # Jobs report their own errors; this only guards the worker.
+                print(f"[SCHEDULER ❌] Job {job_id} crashed: {e}")
+                traceback.print_exc()
+            finally:
+                with self._cond:
+                    self._running[platform] -= 1
+                    self.completed += 1
+                    self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            queued = {}
+            for entry in self._queue:
+                queued[entry[3]] = queued.get(entry[3], 0) + 1
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": len(self._queue),
+                "queued_by_platform": queued,
+                "running_by_platform": {k: v for k, v in self._running.items() if v},
+                "platform_limits": self.platform_limits,
+                "default_limit": self.default_limit,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+download_scheduler = DownloadScheduler(
+    workers=SCHEDULER_WORKERS,
+    max_queue=SCHEDULER_MAX_QUEUE,
+    platform_limits=PLATFORM_CONCURRENCY,
+    default_limit=DEFAULT_PLATFORM_CONCURRENCY,
+)
+
+
+class FragmentBudget:
+    """
+    Server-wide cap on in-flight DASH/HLS fragments. Each job asks for its
+    platform's fragment concurrency and gets what is left of the budget,
+    never less than one (plain sequential fragments), so a long video
+    cannot take every connection from the jobs that start after it.
+    """
+
+    def __init__(self, total=32, platform_limits=None, default_limit=1):
+        self.total = total
+        self.platform_limits = platform_limits or {}
+        self.default_limit = default_limit
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.reduced = 0  # jobs granted less than they asked for
+
+    def _grant(self, platform):
+        wanted = max(1, self.platform_limits.get(platform, self.default_limit))
+        with self._lock:
+            granted = max(1, min(wanted, self.total - self.in_use))
+            self.in_use += granted
+            if granted < wanted:
+                self.reduced += 1
+        return granted
+
+    def _release(self, granted):
+        with self._lock:
+            self.in_use -= granted
+
+    @contextmanager
+    def reserve(self, platform):
+        """Yields the fragment concurrency this job may use."""
+        granted = self._grant(platform)
+        try:
+            yield granted
+        finally:
+            self._release(granted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "budget": self.total,
+                "in_use": self.in_use,
+                "platform_limits": self.platform_limits,
+                "reduced_grants": self.reduced,
+            }
+
+
+fragment_budget = FragmentBudget(
+    total=FRAGMENT_BUDGET,
+    platform_limits=FRAGMENT_CONCURRENCY,
+    default_limit=DEFAULT_FRAGMENT_CONCURRENCY,
+)
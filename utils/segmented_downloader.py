@@ -0,0 +1,308 @@
+# 📁 utils/segmented_downloader.py
+#
+# Multi-connection downloads for plain file URLs (TikTok / Facebook CDN links).
+# The target is preallocated, split into byte ranges fetched in parallel over
+# pooled connections, and each range is written in place with os.pwrite.
+# Servers that ignore Range get a single stream instead. A paused ranged
+# download keeps its .part file plus a .ranges sidecar and picks up from there.
+
+import os
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+
+import requests
+from requests.adapters import HTTPAdapter
+from yt_dlp.utils import DownloadError
+
+from config import SEGMENTED_CONNECTIONS, SEGMENTED_MIN_SIZE, SEGMENT_RETRIES
+
+CHUNK_SIZE = 256 * 1024
+MIN_SEGMENT_SIZE = 1024 * 1024
+PROGRESS_INTERVAL = 0.5  # seconds between progress callbacks
+REQUEST_TIMEOUT = (10, 30)  # connect, read
+
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=SEGMENTED_CONNECTIONS * 4)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+_write_lock = threading.Lock()
+
+
+class DownloadCancelled(Exception):
+    """The cancel event was set while the file was downloading."""
+
+
+class DownloadPaused(Exception):
+    """The pause event was set; partial data is kept for a later resume."""
+
+
+def _check_stop(cancel_event, pause_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise DownloadCancelled("Cancelled by user")
+    if pause_event is not None and pause_event.is_set():
+        raise DownloadPaused("Paused by user")
+
+
+def _pwrite(fd, data, offset):
+    if hasattr(os, "pwrite"):
+        return os.pwrite(fd, data, offset)
+    with _write_lock:  # no positional writes on this OS
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.write(fd, data)
+
+
+def _preallocate(fd, size):
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            pass  # e.g. filesystems without fallocate support
+    os.ftruncate(fd, size)
+
+
+class _Progress:
+    def __init__(self, total, callback):
+        self.total = total
+        self.callback = callback
+        self.done = 0
+        self.started = time.monotonic()
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, n, force=False):
+        with self._lock:
+            self.done += n
+            now = time.monotonic()
+            if not self.callback or (not force and now - self._last < PROGRESS_INTERVAL):
+                return
+            self._last = now
+            done = self.done
+        self.callback(done, self.total, done / max(now - self.started, 1e-6))
+
+
+def direct_download_target(ydl, selected: dict) -> dict | None:
+    """
+    Returns download_ranged() kwargs if yt-dlp selected a single plain
+    HTTP(S) file, or None when it needs yt-dlp (merges, HLS, DASH).
+    """
+    if selected.get("requested_formats") or not selected.get("url"):
+        return None
+    if selected.get("protocol") not in ("http", "https"):
+        return None
+
+    headers = dict(selected.get("http_headers") or {})
+    cookies = ydl.cookiejar.get_cookies_for_url(selected["url"])
+    if cookies:
+        headers["Cookie"] = "; ".join(f"{c.name}={c.value}" for c in cookies)
+    return {"url": selected["url"], "headers": headers, "proxy": ydl.params.get("proxy")}
+
+
+def download_ranged(url, output_path, headers=None, proxy=None, progress=None, cancel_event=None,
+                    pause_event=None, on_start=None, throttle=None, connections=SEGMENTED_CONNECTIONS):
+    """
+    Downloads url to output_path. progress(downloaded, total, bytes_per_sec)
+    is called at most every PROGRESS_INTERVAL. Raises DownloadCancelled or
+    DownloadPaused when the matching event is set; calling again after a
+    pause resumes the remaining ranges. on_start(size, watermark) is called
+    once writing begins; watermark() is the length of the contiguous prefix
+    already on disk (None for a sequential single stream). throttle(nbytes)
+    is called by every connection after each chunk and may block to slow it
+    down. Returns {"size", "connections", "ranged", "elapsed"}.
+
+    HTTP and connection failures (an expired or revoked signed URL) are
+    raised as yt-dlp's DownloadError, like the same failure inside yt-dlp,
+    so callers can re-extract and try again.
+    """
+    try:
+        return _download_ranged(url, output_path, headers, proxy, progress, cancel_event,
+                                pause_event, on_start, throttle, connections)
+    except (DownloadCancelled, DownloadPaused):
+        raise
+    except OSError as e:  # requests.RequestException is an IOError too
+        raise DownloadError(f"Direct download failed: {e}") from e
+
+
+def _download_ranged(url, output_path, headers, proxy, progress, cancel_event,
+                     pause_event, on_start, throttle, connections):
+    headers = dict(headers or {})
+    proxies = {"http": proxy, "https": proxy} if proxy else None
+    part_path = output_path + ".part"
+    state_path = part_path + ".ranges"
+    start = time.time()
+    ranged = False
+
+    # One-byte range probe: a 206 tells us the size and that ranges work.
+    # Anything else is streamed straight from this response.
+    probe = _session.get(url, headers={**headers, "Range": "bytes=0-0"}, stream=True,
+                         timeout=REQUEST_TIMEOUT, proxies=proxies)
+    try:
+        probe.raise_for_status()
+        size = None
+        if probe.status_code == 206:
+            total = probe.headers.get("Content-Range", "").rpartition("/")[2]
+            size = int(total) if total.isdigit() else None
+
+        if size and size >= SEGMENTED_MIN_SIZE and connections > 1:
+            probe.close()
+            ranged = True
+            segments = _download_segments(
+                probe.url, part_path, state_path, size, connections, headers, proxies,
+                progress, cancel_event, pause_event, on_start, throttle
+            )
+        else:
+            if probe.status_code == 206:
+                # Small file: one plain request is cheaper than more ranges
+                probe.close()
+                probe = _session.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT, proxies=proxies)
+                probe.raise_for_status()
+            segments = 1
+            if on_start:
+                length = probe.headers.get("Content-Length")
+                on_start(int(length) if length and length.isdigit() else None, None)
+            size = _download_single(probe, part_path, progress, cancel_event, pause_event, throttle)
+    except DownloadPaused:
+        if not ranged and os.path.exists(part_path):
+            os.remove(part_path)  # a plain stream cannot be resumed
+        raise
+    except BaseException:
+        for path in (part_path, state_path):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+    finally:
+        probe.close()
+
+    os.replace(part_path, output_path)
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    elapsed = time.time() - start
+    print(
+        f"[SEGMENTED DL] ✅ {os.path.basename(output_path)}: {round(size / 1024 / 1024, 2)}MB in "
+        f"{round(elapsed, 2)}s over {segments} connection(s)"
+    )
+    return {"size": size, "connections": segments, "ranged": ranged, "elapsed": elapsed}
+
+
+def _download_single(response, part_path, progress, cancel_event, pause_event, throttle):
+    length = response.headers.get("Content-Length")
+    tracker = _Progress(int(length) if length and length.isdigit() else 0, progress)
+    with open(part_path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            _check_stop(cancel_event, pause_event)
+            if chunk:
+                f.write(chunk)
+                tracker.add(len(chunk))
+                if throttle:
+                    throttle(len(chunk))
+    tracker.add(0, force=True)
+    return tracker.done
+
+
+def _saved_ranges(part_path, state_path, size):
+    """Remaining [next_offset, last] ranges of a paused download, or None."""
+    if not (os.path.exists(part_path) and os.path.exists(state_path)):
+        return None
+    try:
+        with open(state_path) as f:
+            state = json.load(f)
+        if state.get("size") == size and os.path.getsize(part_path) == size:
+            return [r for r in state["ranges"] if r[0] <= r[1]]
+    except Exception as e:
+        print(f"[SEGMENTED DL ⚠️] Ignoring unreadable resume state {state_path}: {e}")
+    return None
+
+
+def _contiguous_bytes(ranges, size):
+    # Ranges are ordered; the first unfinished one's write offset is the end
+    # of the gap-free prefix.
+    for offset, last in ranges:
+        if offset <= last:
+            return offset
+    return size
+
+
+def _download_segments(url, part_path, state_path, size, connections, headers, proxies,
+                       progress, cancel_event, pause_event, on_start, throttle):
+    ranges = _saved_ranges(part_path, state_path, size)
+    if ranges is not None:
+        remaining = sum(last + 1 - first for first, last in ranges)
+        print(f"[SEGMENTED DL] ⏯️ Resuming {os.path.basename(part_path)}: {round(remaining / 1024 / 1024, 2)}MB left")
+        flags = os.O_RDWR
+    else:
+        segments = min(connections, -(-size // MIN_SEGMENT_SIZE))
+        step = -(-size // segments)
+        ranges = [[offset, min(offset + step, size) - 1] for offset in range(0, size, step)]
+        remaining = size
+        flags = os.O_RDWR | os.O_CREAT | os.O_TRUNC
+
+    tracker = _Progress(size, progress)
+    tracker.done = size - remaining
+    abort = threading.Event()  # first failed range stops the others
+
+    fd = os.open(part_path, flags | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        if flags & os.O_TRUNC:
+            _preallocate(fd, size)
+        if on_start:
+            on_start(size, lambda: _contiguous_bytes(ranges, size))
+        # Each worker advances ranges[i][0] as it writes, so the list is
+        # always the resume state.
+        with ThreadPoolExecutor(max_workers=max(1, len(ranges)), thread_name_prefix="yts-range") as pool:
+            futures = [
+                pool.submit(_fetch_range, url, headers, proxies, fd, r, tracker, abort, cancel_event, pause_event, throttle)
+                for r in ranges
+            ]
+            done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            failed = next((f for f in done if f.exception()), None)
+            if failed:
+                abort.set()
+                wait(futures)
+                raise failed.exception()
+    except DownloadPaused:
+        with open(state_path, "w") as f:
+            json.dump({"size": size, "ranges": ranges}, f)
+        print(f"[SEGMENTED DL] ⏸️ Paused {os.path.basename(part_path)} at {tracker.done}/{size} bytes")
+        raise
+    finally:
+        os.close(fd)
+    tracker.add(0, force=True)
+    return len(ranges)
+
+
+def _fetch_range(url, headers, proxies, fd, byte_range, tracker, abort, cancel_event, pause_event, throttle):
+    last = byte_range[1]
+    for attempt in range(SEGMENT_RETRIES + 1):
+        try:
+            offset = byte_range[0]
+            if offset > last:
+                return
+            with _session.get(url, headers={**headers, "Range": f"bytes={offset}-{last}"}, stream=True,
+                              timeout=REQUEST_TIMEOUT, proxies=proxies) as r:
+                if r.status_code != 206:
+                    raise requests.HTTPError(f"Expected 206 for bytes {offset}-{last}, got {r.status_code}")
+                for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                    _check_stop(cancel_event, pause_event)
+                    if abort.is_set():
+                        return
+                    chunk = chunk[:last + 1 - offset]
+                    if chunk:
+                        _pwrite(fd, chunk, offset)
+                        offset += len(chunk)
+                        byte_range[0] = offset
+                        tracker.add(len(chunk))
+                        if throttle:
+                            throttle(len(chunk))
+            if offset > last:
+                return
+            raise IOError(f"Range ending at {last} stopped early at byte {offset}")
+        except (DownloadCancelled, DownloadPaused):
+            raise
+        except Exception as e:
+            if attempt == SEGMENT_RETRIES or abort.is_set():
+                raise
+            print(f"[SEGMENTED DL ⚠️] bytes {byte_range[0]}-{last} failed ({e}); retry {attempt + 1}/{SEGMENT_RETRIES}")
+            time.sleep(min(2 ** attempt, 5))
@@ -0,0 +1,59 @@
+# 📁 utils/status_events.py
+#
+# Server-Sent Events for /status/<download_id>/events. Each client gets the
+# current status at once, then every status change as it happens. Progress
+# ticks that arrive faster than SSE_MIN_INTERVAL are coalesced into the latest
+# one; a change of "status" is always sent straight away. The stream ends with
+# a "done" event once the job is completed, failed or canceled.
+
+import json
+import time
+
+from config import SSE_MIN_INTERVAL, SSE_KEEPALIVE
+from utils.status_manager import wait_for_change
+
+FINAL_STATUSES = {"completed", "error", "canceled", "cancelled"}
+RETRY_MS = 3000  # EventSource reconnect delay
+
+
+def _event(data, version, name=None):
+    lines = [f"id: {version}"]
+    if name:
+        lines.append(f"event: {name}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def status_events(download_id, decorate=None, min_interval=SSE_MIN_INTERVAL, keepalive=SSE_KEEPALIVE):
+    """
+    Yields SSE frames for one job. decorate(status) may add fields (such as
+    the queue position) to each status before it is sent.
+    """
+    yield f"retry: {RETRY_MS}\n\n"
+    version = -1
+    pending = None  # newest status not sent yet
+    last_state, last_sent = None, 0.0
+
+    while True:
+        timeout = keepalive if pending is None else max(0.0, last_sent + min_interval - time.monotonic())
+        change = wait_for_change(download_id, version, timeout)
+        if change is None:
+            yield _event({"status": "unknown", "error": "Status expired"}, version, "done")
+            return
+        if change[0] != version:
+            version, pending = change
+
+        if pending is None:
+            yield ": keepalive\n\n"
+            continue
+
+        state = pending.get("status")
+        if state == last_state and time.monotonic() - last_sent < min_interval:
+            continue  # coalesce: wait for the window to close or the next change
+
+        data = decorate(pending) if decorate else pending
+        final = state in FINAL_STATUSES
+        yield _event(data, version, "done" if final else None)
+        if final:
+            return
+        last_state, last_sent, pending = state, time.monotonic(), None
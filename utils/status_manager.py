@@ -1,126 +1,490 @@
 import os
-from threading import Lock
-from time import time
-
-_status_map = {}
-_timestamp_map = {}
-_lock = Lock()
-
-DEFAULT_STATUS = {
-    "status": "pending",            # pending / downloading / converting / converted / completed / error / canceled
-    "progress": 0.0,                # percent as float
-    "speed": "0KB/s",               # human-readable
-    "eta": None,                    # estimated time remaining
-    "downloaded": 0,                # bytes
-    "total": 0,                     # bytes
-    "video_url": None,
-    "platform": None,
-    "phase": None,                  # metadata / download / merge / convert
-    "message": None,                # optional message
-    "error": None,
-    "timestamp": 0,                 # last update
-    "created_at": 0,                # creation time
-    "completed_at": None,           # when done
-    "file_type": "video",           # video / audio
-    "filename": None                # actual saved filename
-}
+import json
+import sqlite3
+import threading
+from threading import Condition, Lock
+from time import time, monotonic, sleep
+
+from config import STATUS_SHARDS, STATUS_PROGRESS_INTERVAL
+from config import STATUS_BACKEND, STATUS_DB_PATH, STATUS_POLL_INTERVAL
 
 # Minimum file size to treat download as valid
 MIN_VALID_FILESIZE = 512 * 1024  # 512KB
 
+FINISHED_STATUSES = {"completed", "converted", "error", "canceled"}
+# An update touching only these fields, without changing "status", is a
+# progress tick and is subject to the per-job write interval
+PROGRESS_FIELDS = {"status", "progress", "speed", "eta", "downloaded", "total"}
 
-def _ensure_initialized(download_id: str):
-    if download_id not in _status_map:
-        now = int(time())
-        _status_map[download_id] = DEFAULT_STATUS.copy()
-        _status_map[download_id]["created_at"] = now
-        _timestamp_map[download_id] = now
 
+def format_speed(bytes_per_sec) -> str:
+    return f"{round(bytes_per_sec / 1024, 1)}KB/s" if bytes_per_sec else "0KB/s"
 
-def update_status(download_id: str, data: dict):
-    with _lock:
-        _ensure_initialized(download_id)
-        now = int(time())
-        _status_map[download_id].update(data)
-        _status_map[download_id]["timestamp"] = now
-        _timestamp_map[download_id] = now
 
-        if data.get("status") in {"completed", "converted", "error", "canceled"}:
-            _status_map[download_id]["completed_at"] = now
+class StatusRecord:
+    """
+    One job's status. Speed, sizes and times stay numeric; to_dict() turns
+    the record into the /status response shape. Fields no job sets often
+    live in extra, which is only created when needed.
+    """
+
+    FIELDS = (
+        "status",                # pending / queued / downloading / paused / converting / converted / completed / error / canceled
+        "progress",              # percent as float
+        "speed",                 # bytes per second
+        "eta",                   # estimated seconds remaining
+        "downloaded",            # bytes
+        "total",                 # bytes
+        "video_url",
+        "audio_url",
+        "platform",
+        "phase",                 # metadata / download / merge / convert
+        "message",               # optional message
+        "error",
+        "timestamp",             # last update (epoch seconds)
+        "created_at",            # creation time
+        "completed_at",          # when done
+        "file_type",             # video / audio
+        "filename",              # actual saved filename
+        "fragment_concurrency",  # parallel DASH/HLS fragments granted
+        "postprocess",           # {"path": none/remux/transcode, "reason", "seconds"}
+    )
+    __slots__ = FIELDS + ("extra", "version", "tick_at")
+    _FIELD_SET = frozenset(FIELDS)
+
+    def __init__(self, now: float):
+        self.status = "pending"
+        self.progress = 0.0
+        self.speed = 0.0
+        self.eta = None
+        self.downloaded = 0
+        self.total = 0
+        self.video_url = None
+        self.audio_url = None
+        self.platform = None
+        self.phase = None
+        self.message = None
+        self.error = None
+        self.timestamp = now
+        self.created_at = now
+        self.completed_at = None
+        self.file_type = "video"
+        self.filename = None
+        self.fragment_concurrency = None
+        self.postprocess = None
+        self.extra = None
+        self.version = 0     # change counter, for /status/<id>/events
+        self.tick_at = 0.0   # monotonic time of the last progress write
+
+    def apply(self, data: dict, now: float):
+        for key, value in data.items():
+            if key in self._FIELD_SET:
+                setattr(self, key, value)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[key] = value
+        self.speed = self.speed or 0.0  # yt-dlp reports None before the first chunk
+        self.timestamp = now
+        if data.get("status") in FINISHED_STATUSES:
+            self.completed_at = now
+        self.version += 1
+
+    def raw(self) -> dict:
+        """Unformatted fields, for backends that store the record elsewhere."""
+        data = {key: getattr(self, key) for key in self.FIELDS}
+        if self.extra:
+            data["extra"] = self.extra
+        return data
+
+    @classmethod
+    def from_raw(cls, data: dict, version: int = 0) -> "StatusRecord":
+        record = cls(0)
+        for key in cls.FIELDS:
+            if key in data:
+                setattr(record, key, data[key])
+        record.extra = data.get("extra")
+        record.version = version
+        return record
+
+    def to_dict(self) -> dict:
+        data = {key: getattr(self, key) for key in self.FIELDS}
+        data["speed"] = format_speed(self.speed)
+        data["timestamp"] = int(self.timestamp)
+        data["created_at"] = int(self.created_at)
+        if self.completed_at is not None:
+            data["completed_at"] = int(self.completed_at)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def summary(self) -> dict:
+        return {
+            "status": self.status,
+            "progress": self.progress,
+            "speed": format_speed(self.speed),
+            "video_url": self.video_url,
+            "file_type": self.file_type,
+            "filename": self.filename
+        }
+
+
+def _is_tick(current_status: str | None, data: dict) -> bool:
+    if current_status is None or not PROGRESS_FIELDS.issuperset(data):
+        return False
+    return data.get("status", current_status) == current_status
+
+
+# Backends: StatusStore keeps statuses in this process; SQLiteStatusStore
+# shares them between processes (gunicorn workers). Both provide update, get,
+# has, wait_for_change, clear, cleanup_stale, items and stats; the module
+# functions below only talk to whichever one is configured. Lookups never
+# create a record, only updates do.
+
+class _Shard:
+    __slots__ = ("lock", "statuses", "conditions")
+
+    def __init__(self):
+        self.lock = Lock()
+        self.statuses = {}     # download_id -> StatusRecord
+        self.conditions = {}   # download_id -> Condition, only for ids someone is waiting on
+
+
+class StatusStore:
+    """
+    Job statuses split over lock-striped shards, so jobs in different shards
+    never wait on each other. Progress ticks are written at most once per
+    progress_interval per job; anything else is written immediately.
+    """
+
+    def __init__(self, shards=STATUS_SHARDS, progress_interval=STATUS_PROGRESS_INTERVAL):
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self.progress_interval = progress_interval
+
+    def _shard(self, download_id):
+        return self._shards[hash(download_id) % len(self._shards)]
+
+    def _apply(self, shard, download_id, data):
+        # Caller holds shard.lock
+        now = time()
+        record = shard.statuses.get(download_id)
+        if record is None:
+            record = shard.statuses[download_id] = StatusRecord(now)
+        record.apply(data, now)
+        cond = shard.conditions.get(download_id)
+        if cond:
+            cond.notify_all()
+        return record
+
+    def update(self, download_id, data):
+        shard = self._shard(download_id)
+        # Lock-free peek at the current record; a stale read only delays a tick
+        record = shard.statuses.get(download_id)
+        if self.progress_interval and record is not None and _is_tick(record.status, data):
+            now = monotonic()
+            if now - record.tick_at < self.progress_interval:
+                return  # coalesced: the next tick carries newer numbers anyway
+            with shard.lock:
+                self._apply(shard, download_id, data).tick_at = now
+            return
+        with shard.lock:
+            self._apply(shard, download_id, data)
+
+    def get(self, download_id):
+        shard = self._shard(download_id)
+        with shard.lock:
+            record = shard.statuses.get(download_id)
+            return record.to_dict() if record else None
+
+    def has(self, download_id):
+        return download_id in self._shard(download_id).statuses
+
+    def wait_for_change(self, download_id, since_version, timeout):
+        shard = self._shard(download_id)
+        with shard.lock:
+            if download_id not in shard.statuses:
+                return None
+            cond = shard.conditions.get(download_id)
+            if cond is None:
+                cond = shard.conditions[download_id] = Condition(shard.lock)
+            cond.wait_for(
+                lambda: download_id not in shard.statuses or shard.statuses[download_id].version != since_version,
+                timeout
+            )
+            record = shard.statuses.get(download_id)
+            return (record.version, record.to_dict()) if record else None
+
+    def _drop(self, shard, download_id):
+        # Caller holds shard.lock
+        shard.statuses.pop(download_id, None)
+        cond = shard.conditions.pop(download_id, None)
+        if cond:
+            cond.notify_all()
+
+    def clear(self, download_id):
+        shard = self._shard(download_id)
+        with shard.lock:
+            self._drop(shard, download_id)
+
+    def cleanup_stale(self, timeout_seconds, keep=None):
+        removed = 0
+        cutoff = time() - timeout_seconds
+        for shard in self._shards:
+            with shard.lock:
+                stale_ids = [
+                    did for did, record in shard.statuses.items()
+                    if record.timestamp < cutoff and not (keep and keep(did))
+                ]
+                for did in stale_ids:
+                    self._drop(shard, did)
+            removed += len(stale_ids)
+        return removed
+
+    def items(self, summary=False):
+        """(download_id, status dict) pairs, locking one shard at a time."""
+        for shard in self._shards:
+            with shard.lock:
+                snapshot = [
+                    (k, record.summary() if summary else record.to_dict())
+                    for k, record in shard.statuses.items()
+                ]
+            yield from snapshot
+
+    def stats(self):
+        return {
+            "backend": "memory",
+            "shards": len(self._shards),
+            "jobs": sum(len(shard.statuses) for shard in self._shards),
+            "progress_interval": self.progress_interval,
+        }
+
+
+def _process_alive(pid) -> bool:
+    if os.name == "nt":
+        return True  # os.kill would terminate it; never treat another owner as gone
+    if not pid or pid <= 0:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SQLiteStatusStore:
+    """
+    Statuses in one SQLite table (WAL mode), so every gunicorn worker sees
+    the same record whichever one runs the download. Progress ticks are
+    rate-limited in the writing process, which is the one running the job.
+    Waiting for a change polls, since there is no cross-process notify.
+
+    Each row records the pid that last wrote it. Every worker runs its own
+    stale sweep, and a worker only removes its own rows (the ones its job
+    registry can vouch for) plus rows whose writer has exited.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS statuses (
+        download_id TEXT PRIMARY KEY,
+        data TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        updated_at INTEGER NOT NULL,
+        owner INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS idx_statuses_updated_at ON statuses(updated_at);
+    """
+
+    def __init__(self, path=STATUS_DB_PATH, progress_interval=STATUS_PROGRESS_INTERVAL,
+                 poll_interval=STATUS_POLL_INTERVAL):
+        self.path = path
+        self.progress_interval = progress_interval
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        # download_id -> (last status written here, monotonic time of the last
+        # tick, monotonic time of the last write); pruned by age in cleanup_stale
+        self._written = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self._SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(statuses)")}
+            if "owner" not in columns:  # databases created before rows had an owner
+                try:
+                    conn.execute("ALTER TABLE statuses ADD COLUMN owner INTEGER NOT NULL DEFAULT 0")
+                except sqlite3.OperationalError:
+                    pass  # another worker added it first
+            self._local.conn = conn
+        return conn
+
+    def _load(self, conn, download_id):
+        row = conn.execute("SELECT data, version FROM statuses WHERE download_id = ?", (download_id,)).fetchone()
+        return StatusRecord.from_raw(json.loads(row[0]), row[1]) if row else None
+
+    def update(self, download_id, data):
+        written = self._written.get(download_id)
+        tick = bool(self.progress_interval and written and _is_tick(written[0], data))
+        now_mono = monotonic()
+        if tick and now_mono - written[1] < self.progress_interval:
+            return  # coalesced: the next tick carries newer numbers anyway
+
+        conn = self._connect()
+        now = time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            record = self._load(conn, download_id) or StatusRecord(now)
+            record.apply(data, now)
+            conn.execute(
+                "INSERT OR REPLACE INTO statuses (download_id, data, version, updated_at, owner) VALUES (?, ?, ?, ?, ?)",
+                (download_id, json.dumps(record.raw(), default=str), record.version, int(now), os.getpid())
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._written[download_id] = (record.status, now_mono if tick else (written[1] if written else 0.0), now_mono)
+
+    def get(self, download_id):
+        record = self._load(self._connect(), download_id)
+        return record.to_dict() if record else None
+
+    def has(self, download_id):
+        return self._connect().execute(
+            "SELECT 1 FROM statuses WHERE download_id = ?", (download_id,)
+        ).fetchone() is not None
+
+    def wait_for_change(self, download_id, since_version, timeout):
+        conn = self._connect()
+        deadline = monotonic() + (timeout or 0)
+        while True:
+            record = self._load(conn, download_id)
+            if record is None:
+                return None
+            if record.version != since_version or monotonic() >= deadline:
+                return record.version, record.to_dict()
+            sleep(min(self.poll_interval, max(0.0, deadline - monotonic())))
+
+    def clear(self, download_id):
+        self._written.pop(download_id, None)
+        self._connect().execute("DELETE FROM statuses WHERE download_id = ?", (download_id,))
+
+    def cleanup_stale(self, timeout_seconds, keep=None):
+        cutoff = int(time()) - timeout_seconds
+        conn = self._connect()
+        pid = os.getpid()
+        alive = {pid: True}
+        stale_ids = []
+        for did, owner in conn.execute(
+            "SELECT download_id, owner FROM statuses WHERE updated_at < ?", (cutoff,)
+        ).fetchall():
+            if owner == pid:
+                if not (keep and keep(did)):
+                    stale_ids.append(did)
+            elif not alive.setdefault(owner, _process_alive(owner)):
+                stale_ids.append(did)  # its worker exited; nobody else will sweep it
+        conn.executemany("DELETE FROM statuses WHERE download_id = ?", [(did,) for did in stale_ids])
+
+        # Rows may also be deleted by other workers, so forget local write
+        # times by their own age rather than by what was deleted here
+        written_cutoff = monotonic() - timeout_seconds
+        for did, written in list(self._written.items()):
+            if written[2] < written_cutoff:
+                self._written.pop(did, None)
+        return len(stale_ids)
+
+    def items(self, summary=False):
+        rows = self._connect().execute("SELECT download_id, data, version FROM statuses").fetchall()
+        for download_id, data, version in rows:
+            record = StatusRecord.from_raw(json.loads(data), version)
+            yield download_id, record.summary() if summary else record.to_dict()
+
+    def stats(self):
+        (jobs,) = self._connect().execute("SELECT COUNT(*) FROM statuses").fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "jobs": jobs,
+            "progress_interval": self.progress_interval,
+        }
+
+
+def _create_store():
+    if STATUS_BACKEND == "sqlite":
+        print(f"[STATUS] 🗄️ Using shared SQLite status store at {STATUS_DB_PATH}")
+        return SQLiteStatusStore()
+    if STATUS_BACKEND != "memory":
+        print(f"[STATUS] ⚠️ Unknown STATUS_BACKEND {STATUS_BACKEND!r}, using in-memory store")
+    return StatusStore()
+
+
+_store = _create_store()
+
+
+def update_status(download_id: str, data: dict):
+    _store.update(download_id, data)
 
 
 def safe_complete(download_id: str, filepath: str = None):
     """
     Safely marks as completed only if the file exists and is valid.
     """
-    with _lock:
-        _ensure_initialized(download_id)
-        now = int(time())
-
-        if filepath and os.path.exists(filepath):
-            size = os.path.getsize(filepath)
-            if size >= MIN_VALID_FILESIZE:
-                _status_map[download_id]["status"] = "completed"
-                _status_map[download_id]["completed_at"] = now
-                _status_map[download_id]["timestamp"] = now
-                _status_map[download_id]["filename"] = os.path.basename(filepath)
-                return True
-            else:
-                update_status(download_id, {
-                    "status": "error",
-                    "message": f"File too small ({size} bytes), download likely failed.",
-                    "error": "incomplete_file"
-                })
-                return False
-        else:
-            update_status(download_id, {
-                "status": "error",
-                "message": "Download file missing or invalid.",
-                "error": "missing_file"
-            })
-            return False
-
-
-def get_status(download_id: str) -> dict:
-    with _lock:
-        _ensure_initialized(download_id)
-        return _status_map.get(download_id, DEFAULT_STATUS.copy())
+    if filepath and os.path.exists(filepath):
+        size = os.path.getsize(filepath)
+        if size >= MIN_VALID_FILESIZE:
+            update_status(download_id, {"status": "completed", "filename": os.path.basename(filepath)})
+            return True
+        update_status(download_id, {
+            "status": "error",
+            "message": f"File too small ({size} bytes), download likely failed.",
+            "error": "incomplete_file"
+        })
+        return False
+    update_status(download_id, {
+        "status": "error",
+        "message": "Download file missing or invalid.",
+        "error": "missing_file"
+    })
+    return False
+
+
+def get_status(download_id: str) -> dict | None:
+    """The job's status as a response dict, or None for unknown ids."""
+    return _store.get(download_id)
+
+
+def wait_for_change(download_id: str, since_version: int, timeout: float):
+    """
+    Blocks until the status is newer than since_version or timeout passes.
+    Returns (version, status dict), or None if the id is unknown or cleared.
+    """
+    return _store.wait_for_change(download_id, since_version, timeout)
+
+
+def has_status(download_id: str) -> bool:
+    return _store.has(download_id)
 
 
 def clear_status(download_id: str):
-    with _lock:
-        _status_map.pop(download_id, None)
-        _timestamp_map.pop(download_id, None)
+    _store.clear(download_id)
+
+
+def cleanup_stale_statuses(timeout_seconds=3600, keep=None):
+    """Drops statuses not updated for timeout_seconds, except ids keep(id) protects."""
+    return _store.cleanup_stale(timeout_seconds, keep)
 
 
-def cleanup_stale_statuses(timeout_seconds=3600):
-    with _lock:
-        now = int(time())
-        stale_ids = [
-            did for did, ts in _timestamp_map.items()
-            if now - ts > timeout_seconds
-        ]
-        for did in stale_ids:
-            _status_map.pop(did, None)
-            _timestamp_map.pop(did, None)
+def status_store_stats() -> dict:
+    return _store.stats()
 
 
 def list_all_statuses(include_meta=False) -> dict:
-    with _lock:
-        if include_meta:
-            return {k: v.copy() for k, v in _status_map.items()}
-        else:
-            return {
-                k: {
-                    "status": v["status"],
-                    "progress": v["progress"],
-                    "speed": v["speed"],
-                    "video_url": v["video_url"],
-                    "file_type": v.get("file_type", "video"),
-                    "filename": v.get("filename")
-                }
-                for k, v in _status_map.items()
-            }
+    return dict(_store.items(summary=not include_meta))
 
 
 def mark_error(download_id: str, error_message: str):
@@ -128,7 +492,7 @@ def mark_error(download_id: str, error_message: str):
         "status": "error",
         "error": error_message,
         "message": "Download failed",
-        "completed_at": int(time())
+        "completed_at": time()
     })
 
 
@@ -136,5 +500,5 @@ def mark_cancelled(download_id: str):
     update_status(download_id, {
         "status": "canceled",
         "message": "Download canceled by user",
-        "completed_at": int(time())
+        "completed_at": time()
     })
@@ -0,0 +1,149 @@
+import json
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import BoundedSemaphore, Lock
+from time import time
+
+import yt_dlp
+
+from config import (
+    ENABLE_YDL_POOL,
+    YDL_POOL_MAX_IN_USE,
+    YDL_POOL_MAX_IDLE_PER_PROFILE,
+    YDL_POOL_MAX_PROFILES,
+    YDL_POOL_MAX_AGE,
+)
+
+
+class PoolExhausted(Exception):
+    """No YoutubeDL slot became free before the checkout timeout."""
+
+
+class YoutubeDLPool:
+    """
+    Bounded pool of warm yt_dlp.YoutubeDL instances.
+
+    Instances are keyed by (platform, cookiefile, proxy, header set, other
+    options), so a checked-out instance always matches the options asked for.
+    Each instance is used by one thread at a time; total concurrent use is
+    capped by a semaphore. Only option sets without per-call state (progress
+    hooks, outtmpl, postprocessors) should be pooled.
+    """
+
+    def __init__(self, max_in_use=16, max_idle_per_profile=4, max_profiles=32, max_age=900, enabled=True):
+        self.enabled = enabled
+        self.max_idle_per_profile = max_idle_per_profile
+        self.max_profiles = max_profiles
+        self.max_age = max_age
+        self._slots = BoundedSemaphore(max_in_use)
+        self._idle = OrderedDict()  # key -> [(created_at, ydl), ...]
+        self._lock = Lock()
+        self.max_in_use = max_in_use
+        self.in_use = 0
+        self.created = 0
+        self.reused = 0
+        self.retired = 0
+
+    @staticmethod
+    def profile_key(opts: dict, platform: str = "generic") -> tuple:
+        headers = opts.get('http_headers') or {}
+        rest = {k: v for k, v in opts.items() if k not in ('http_headers', 'cookiefile', 'proxy')}
+        return (
+            platform,
+            opts.get('cookiefile'),
+            opts.get('proxy'),
+            tuple(sorted(headers.items())),
+            json.dumps(rest, sort_keys=True, default=str),
+        )
+
+    def _take_idle(self, key):
+        now = time()
+        with self._lock:
+            bucket = self._idle.get(key)
+            while bucket:
+                created_at, ydl = bucket.pop()
+                if now - created_at <= self.max_age:
+                    self._idle.move_to_end(key)
+                    return created_at, ydl
+                self._retire(ydl)
+        return None, None
+
+    def _give_back(self, key, created_at, ydl):
+        with self._lock:
+            bucket = self._idle.setdefault(key, [])
+            self._idle.move_to_end(key)
+            if len(bucket) < self.max_idle_per_profile and time() - created_at <= self.max_age:
+                bucket.append((created_at, ydl))
+                ydl = None
+
+            while len(self._idle) > self.max_profiles:
+                _, stale = self._idle.popitem(last=False)
+                for _, old in stale:
+                    self._retire(old)
+
+        if ydl is not None:
+            self._retire(ydl)
+
+    def _retire(self, ydl):
+        self.retired += 1
+        try:
+            ydl.close()
+        except Exception as e:
+            print(f"[YDL POOL] ⚠️ Failed to close instance: {e}")
+
+    @contextmanager
+    def checkout(self, opts: dict, platform: str = "generic", timeout: float = 60):
+        if not self.enabled:
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                yield ydl
+            return
+
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolExhausted(f"No yt-dlp slot free after {timeout}s")
+
+        key = self.profile_key(opts, platform)
+        try:
+            created_at, ydl = self._take_idle(key)
+            if ydl is None:
+                created_at, ydl = time(), yt_dlp.YoutubeDL(opts)
+                self.created += 1
+            else:
+                self.reused += 1
+
+            with self._lock:
+                self.in_use += 1
+            try:
+                yield ydl
+            finally:
+                with self._lock:
+                    self.in_use -= 1
+                self._give_back(key, created_at, ydl)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "profiles": len(self._idle),
+                "idle": sum(len(b) for b in self._idle.values()),
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "created": self.created,
+                "reused": self.reused,
+                "retired": self.retired,
+            }
+
+
+ydl_pool = YoutubeDLPool(
+    max_in_use=YDL_POOL_MAX_IN_USE,
+    max_idle_per_profile=YDL_POOL_MAX_IDLE_PER_PROFILE,
+    max_profiles=YDL_POOL_MAX_PROFILES,
+    max_age=YDL_POOL_MAX_AGE,
+    enabled=ENABLE_YDL_POOL,
+)
+
+
+def pooled_ydl(opts: dict, platform: str = "generic"):
+    """Shortcut for `with ydl_pool.checkout(opts, platform) as ydl:`."""
+    return ydl_pool.checkout(opts, platform)